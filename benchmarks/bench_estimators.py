@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""Benchmark the survey estimators in utils on synthetic microdata.
+
+Each size gets a reproducible weighted survey frame with item columns coded
+1 to 5 (with some missing), and age and gender codes.  For each estimator
+the script records the best wall time over several runs, the peak memory
+traced by tracemalloc in a separate run, and the growth exponent of time
+with the number of rows.  It also checks each estimator's output against a
+reference computed independently with one groupby per item, so a faster
+implementation can be dropped in and checked.  Run from the top of the
+repository:
+
+    python benchmarks/bench_estimators.py --sizes 1e4 1e5 1e6 --output bench.csv
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import (  # noqa: E402
+    estimate_columns,
+    estimate_ordinal,
+    estimate_value_map,
+    ordinal_age_gender_map,
+    ordinal_gender_map,
+)
+
+VALUES = [1, 2, 3, 4, 5]
+VALUE_MAP = {1: "Never", 2: "Rarely", 3: "Sometimes", 4: "Often", 5: "Always"}
+GENDER_MAP = {1: "Male", 2: "Female"}
+AGE_MAP = {1: "18-29", 2: "30-44", 3: "45-64", 4: "65+"}
+
+
+def make_survey(n_rows, n_items=10, missing=0.05, seed=17):
+    """Make a synthetic weighted survey frame.
+
+    Args:
+        n_rows: number of respondents
+        n_items: number of item columns, named item_00, item_01, ...
+        missing: fraction of item responses that are missing
+        seed: seed for numpy.random.default_rng
+
+    Returns:
+        DataFrame with the items, age, gender and weight
+    """
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(n_items):
+        # Skewed response distributions that differ between items
+        probs = rng.dirichlet(np.ones(len(VALUES)) * 2)
+        codes = rng.choice(VALUES, size=n_rows, p=probs).astype(float)
+        codes[rng.random(n_rows) < missing] = np.nan
+        data[f"item_{i:02d}"] = codes
+
+    df = pd.DataFrame(data)
+    df["age"] = rng.choice(list(AGE_MAP), size=n_rows, p=[0.2, 0.3, 0.3, 0.2])
+    df["gender"] = rng.choice(list(GENDER_MAP), size=n_rows)
+    df["weight"] = rng.lognormal(0, 0.5, size=n_rows)
+    return df
+
+
+# =============================================================================
+# References
+# =============================================================================
+
+
+def wilson(weighted_successes, weights, confidence_level):
+    """Wilson intervals with the Kish effective sample size, vectorized.
+
+    Args:
+        weighted_successes: array of sums of weights of successes
+        weights: Series of all weights
+        confidence_level: confidence level
+
+    Returns:
+        tuple of arrays: proportion, lower, upper
+    """
+    total = weights.sum()
+    n_eff = total**2 / (weights**2).sum()
+    z = NormalDist().inv_cdf(1 - (1 - confidence_level) / 2)
+
+    p = np.asarray(weighted_successes, dtype=float) / total
+    denominator = 1 + z**2 / n_eff
+    center = (p + z**2 / (2 * n_eff)) / denominator
+    margin = z * np.sqrt((p * (1 - p) + z**2 / (4 * n_eff)) / n_eff) / denominator
+    return p, center - margin, center + margin
+
+
+def reference_proportions(
+    df, column, values, by=(), cumulative=False, confidence_level=0.95
+):
+    """Estimate proportions like the utils estimators, with one groupby.
+
+    Like utils, each proportion is the share of the total weight in the
+    (group, value) cell, not a share within the group.
+
+    Args:
+        df: DataFrame
+        column: column name
+        values: list of values
+        by: list of (column name, map) pairs to group by
+        cumulative: whether to compute cumulative proportions
+        confidence_level: confidence level
+
+    Returns:
+        DataFrame with the group columns, value, proportion, lower and upper
+    """
+    names = [name for name, _ in by]
+    weights = df.groupby(names + [column])["weight"].sum()
+    if by:
+        table = weights.unstack(column, fill_value=0)
+        groups = pd.MultiIndex.from_product([list(m) for _, m in by], names=names)
+        if len(by) == 1:
+            groups = groups.get_level_values(0)
+        table = table.reindex(groups, fill_value=0)
+    else:
+        table = weights.to_frame().T
+
+    # (groups x values), with every value present in column order
+    table = table.reindex(
+        columns=sorted(set(table.columns) | set(values)), fill_value=0
+    )
+    if cumulative:
+        table = table[table.columns[::-1]].cumsum(axis=1)
+    table = table[values]
+
+    weighted = table.to_numpy().ravel()
+    p, lower, upper = wilson(weighted, df["weight"], confidence_level)
+
+    result = pd.DataFrame(dict(proportion=p, lower=lower, upper=upper))
+    for i, name in enumerate(names):
+        result.insert(i, name, np.repeat(table.index.get_level_values(i), len(values)))
+    result.insert(len(names), "value", np.tile(values, len(table)))
+    return result
+
+
+def compare(result, reference, keys):
+    """Check that two estimate frames agree.
+
+    Args:
+        result: DataFrame from a utils estimator
+        reference: DataFrame from reference_proportions
+        keys: columns to align on
+
+    Returns:
+        largest absolute difference in proportion, lower and upper
+    """
+    merged = result.merge(reference, on=keys, suffixes=("", "_ref"), validate="1:1")
+    if len(merged) != len(reference):
+        return np.inf
+    stats = ["proportion", "lower", "upper"]
+    diffs = [np.abs(merged[s] - merged[f"{s}_ref"]).max() for s in stats]
+    return max(diffs)
+
+
+# =============================================================================
+# Cases
+# =============================================================================
+
+
+def make_cases(df):
+    """Make the estimator calls and their references for one frame.
+
+    Args:
+        df: DataFrame from make_survey
+
+    Returns:
+        dictionary mapping names to (run, check) pairs; check returns the
+        largest difference from the reference
+    """
+    items = [col for col in df.columns if col.startswith("item_")]
+    item = items[0]
+
+    def check_columns(result):
+        refs = [
+            reference_proportions(df, col, VALUES).assign(column=col) for col in items
+        ]
+        return compare(result, pd.concat(refs), ["column", "value"])
+
+    def check_ordinal(result):
+        ref = reference_proportions(df, item, VALUES, cumulative=True)
+        return compare(result, ref, ["value"])
+
+    def check_gender(result):
+        ref = reference_proportions(df, item, VALUES, by=[("gender", GENDER_MAP)])
+        return compare(result, ref, ["gender", "value"])
+
+    def check_age_gender(result):
+        by = [("age", AGE_MAP), ("gender", GENDER_MAP)]
+        ref = reference_proportions(df, item, VALUES, by=by)
+        return compare(result, ref, ["age", "gender", "value"])
+
+    return {
+        "estimate_columns": (
+            lambda: estimate_columns(df, items, VALUES),
+            check_columns,
+        ),
+        "estimate_value_map": (
+            lambda: estimate_value_map(df, items, VALUE_MAP),
+            check_columns,
+        ),
+        "estimate_ordinal": (
+            lambda: estimate_ordinal(df, item, VALUES, cumulative=True),
+            check_ordinal,
+        ),
+        "ordinal_gender_map": (
+            lambda: ordinal_gender_map(df, GENDER_MAP, item, VALUES),
+            check_gender,
+        ),
+        "ordinal_age_gender_map": (
+            lambda: ordinal_age_gender_map(df, AGE_MAP, GENDER_MAP, item, VALUES),
+            check_age_gender,
+        ),
+    }
+
+
+def measure(run, repeat):
+    """Time a call and trace its peak memory.
+
+    Args:
+        run: function with no arguments
+        repeat: number of timed runs
+
+    Returns:
+        tuple of (result, best time in seconds, peak memory in bytes)
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        times.append(time.perf_counter() - start)
+
+    # Traced separately, since tracing slows the run down
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, min(times), peak
+
+
+def scaling_exponents(results):
+    """Fit time ~ rows ** k for each estimator.
+
+    Args:
+        results: DataFrame with estimator, rows and seconds columns
+
+    Returns:
+        Series of exponents indexed by estimator
+    """
+
+    def slope(group):
+        if len(group) < 2:
+            return np.nan
+        x, y = np.log(group["rows"]), np.log(group["seconds"])
+        return np.polyfit(x, y, 1)[0]
+
+    return results.groupby("estimator")[["rows", "seconds"]].apply(slope)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the survey estimators.")
+    parser.add_argument(
+        "--sizes",
+        type=float,
+        nargs="+",
+        default=[1e4, 1e5, 1e6],
+        help="Numbers of rows",
+    )
+    parser.add_argument("--items", type=int, default=10, help="Number of item columns")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case")
+    parser.add_argument("--seed", type=int, default=17, help="Seed for the survey data")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1e-9,
+        help="Largest allowed difference from the references",
+    )
+    parser.add_argument("--output", help="CSV file for the results")
+    args = parser.parse_args()
+
+    rows = []
+    for size in args.sizes:
+        df = make_survey(int(size), args.items, seed=args.seed)
+        for name, (run, check) in make_cases(df).items():
+            result, seconds, peak = measure(run, args.repeat)
+            error = check(result)
+            rows.append(
+                dict(
+                    estimator=name,
+                    rows=len(df),
+                    seconds=seconds,
+                    peak_mb=peak / 1e6,
+                    max_error=error,
+                )
+            )
+            print(
+                f"{name:<24} {len(df):>10} {seconds:>9.3f}s {peak / 1e6:>9.1f} MB"
+                f"  max error {error:.1e}"
+            )
+
+    results = pd.DataFrame(rows)
+    print()
+    print("Scaling exponents (time ~ rows ** k):")
+    print(scaling_exponents(results).round(2).to_string())
+
+    if args.output:
+        results.to_csv(args.output, index=False)
+
+    failed = results[~(results["max_error"] <= args.tolerance)]
+    if len(failed):
+        print(f"\nResults differ from the references:\n{failed.to_string()}")
+        sys.exit(1)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Measure the startup cost of importing utils.
+
+Each statement runs in a fresh interpreter, so nothing is cached between
+runs.  Run from the top of the repository:
+
+    python benchmarks/bench_import.py --repeat 10
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+STATEMENTS = {
+    "python": "pass",
+    "import utils": "import utils",
+    "read_wef_file": "from utils import read_wef_file, code_to_wef_country",
+    "estimators": "from utils import estimate_columns, estimate_ordinal",
+    "plotting": "from utils import decorate, AIBM_COLORS",
+}
+
+
+def time_statement(statement, repeat):
+    """Time a statement in fresh interpreters.
+
+    Args:
+        statement: Python source to run
+        repeat: number of runs
+
+    Returns:
+        list of wall times in seconds
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark utils import time.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per statement")
+    args = parser.parse_args()
+
+    print(f"{'statement':<16} {'median (s)':>10} {'min (s)':>10}")
+    for label, statement in STATEMENTS.items():
+        times = time_statement(statement, args.repeat)
+        print(f"{label:<16} {statistics.median(times):>10.3f} {min(times):>10.3f}")
@@ -1,279 +1,840 @@
 #!/usr/bin/env python3
 import pdfplumber
+from pdfminer.converter import PDFPageAggregator
+from pdfminer.layout import LTChar, LTContainer
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+import numpy as np
 import pandas as pd
 import re
 import argparse
+import bisect
+import cProfile
+import contextlib
+import functools
+import io
+import math
+import pstats
+import time
+import tracemalloc
+from array import array
+from dataclasses import dataclass, fields
 
 
-def extract_pdf_data(page_number, pattern):
-    """Extract data from PDF using pdfplumber, print debug info, and return a dictionary of results."""
-    pdf_path = f"pages/page_{page_number:03d}.pdf"
-    result = {
-        "country": None,
-        "page_number": page_number,
-        "score": None,
-        "rank": None,
-        "diff": None,
-        "left": None,
-        "right": None,
-    }
-    with pdfplumber.open(pdf_path) as pdf:
+@dataclass(slots=True)
+class PageResult:
+    """Values extracted from one country page; None where not found."""
+
+    country: str = None
+    page_number: int = None
+    score: float = None
+    rank: int = None
+    diff: float = None
+    left: float = None
+    right: float = None
+
+
+RESULT_FIELDS = [field.name for field in fields(PageResult)]
+
+
+class ResultColumns:
+    """Accumulate PageResults in typed arrays and build a DataFrame from them."""
+
+    FLOAT_FIELDS = ["score", "diff", "left", "right"]
+    INT_FIELDS = ["page_number", "rank"]
+
+    def __init__(self):
+        self.country = []
+        self.floats = {name: array("d") for name in self.FLOAT_FIELDS}
+        self.ints = {name: array("q") for name in self.INT_FIELDS}
+        self.int_missing = {name: array("b") for name in self.INT_FIELDS}
+
+    def __len__(self):
+        return len(self.country)
+
+    def append(self, result):
+        self.country.append(result.country)
+        for name, values in self.floats.items():
+            value = getattr(result, name)
+            values.append(math.nan if value is None else value)
+        for name, values in self.ints.items():
+            value = getattr(result, name)
+            values.append(0 if value is None else value)
+            self.int_missing[name].append(value is None)
+
+    def frame(self):
+        """Make a DataFrame with the columns in RESULT_FIELDS.
+
+        Integer columns use the nullable Int64 type, so missing ranks don't
+        turn the whole column into floats.
+        """
+        columns = {"country": pd.Series(self.country, dtype=object)}
+        for name, values in self.floats.items():
+            columns[name] = np.frombuffer(values, dtype=np.float64)
+        for name, values in self.ints.items():
+            missing = np.frombuffer(self.int_missing[name], dtype=np.bool_)
+            columns[name] = pd.arrays.IntegerArray(
+                np.frombuffer(values, dtype=np.int64), missing
+            )
+        return pd.DataFrame(columns)[RESULT_FIELDS]
+
+
+# Line that precedes the indicator table on each country page
+MARKER = "global gender gap index indicators"
+
+COUNTRY_RE = re.compile(r"^([^\d]+)")
+PARENTHETICAL_RE = re.compile(r"\s*\(.*\)$")
+NON_DIGIT_RE = re.compile(r"\D")
+
+
+def parse_rank(rank_str):
+    """Get the rank from a string like '104th'."""
+    return int(NON_DIGIT_RE.sub("", rank_str))
+
+
+class PatternMatcher:
+    """Aho-Corasick automaton that finds several substrings in one pass.
+
+    Scanning costs time linear in the length of the text plus the number of
+    matches, however many patterns there are.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].append(index)
+
+        # Breadth-first, so failure links of shallower states are ready first
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[child] = target if target != child else 0
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def find_lines(self, lines):
+        """Find the lines each pattern occurs in.
+
+        Args:
+            lines: list of strings
+
+        Returns:
+            list with a sorted list of line indexes for each pattern
+        """
+        found = [[] for _ in self.patterns]
+        goto, fail, output = self.goto, self.fail, self.output
+        for i, line in enumerate(lines):
+            state = 0
+            for char in line:
+                while state and char not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(char, 0)
+                for index in output[state]:
+                    if not found[index] or found[index][-1] != i:
+                        found[index].append(i)
+        return found
+
+
+@functools.lru_cache(maxsize=None)
+def _matcher(patterns):
+    return PatternMatcher((MARKER,) + patterns)
+
+
+def scan_lines(lower_lines, patterns):
+    """Find the line to parse for each pattern.
+
+    As before, that is the first line after the marker line that contains
+    the pattern, or the first line that contains it if there is no marker.
+
+    Args:
+        lower_lines: list of lowercased lines
+        patterns: tuple of lowercase patterns
+
+    Returns:
+        dictionary mapping each pattern to a line index, or None
+    """
+    found = _matcher(patterns).find_lines(lower_lines)
+    start_idx = found[0][0] + 1 if found[0] else 0
+
+    line_numbers = {}
+    for pattern, indexes in zip(patterns, found[1:]):
+        k = bisect.bisect_left(indexes, start_idx)
+        line_numbers[pattern] = indexes[k] if k < len(indexes) else None
+    return line_numbers
+
+
+def page_path(page_number):
+    """Get the file name of one page of the report."""
+    return f"pages/page_{page_number:03d}.pdf"
+
+
+def read_page_text_pdfplumber(page_number):
+    """Extract the text of one page of the report with pdfplumber."""
+    with pdfplumber.open(page_path(page_number)) as pdf:
         # Get the first page
         page = pdf.pages[0]
+        return page.extract_text()
 
-        # Extract text
-        text = page.extract_text()
-        lines = text.split("\n")
-
-        # Try to extract country name, score, rank, and year from line 13
-        country_name = None
-        if len(lines) > 13:
-            line13 = lines[13]
-
-        # To get the country name, extract everything before the first digit
-        country_name = re.match(r"^([^\d]+)", line13)
-        if country_name:
-            country_name = country_name.group(1).strip()
-            country_name = re.sub(r"\s*\(.*\)$", "", country_name).strip()
-            result["country"] = country_name
-            print(f"Extracted country: {country_name}")
-        else:
-            print("Debug - failed to find country name in line 13")
 
-        # Extract education data
-        found_pattern = False
-        # Skip lines until we find the marker
-        start_idx = 0
-        for i, line in enumerate(lines):
-            if "global gender gap index indicators" in line.lower():
-                start_idx = i + 1
-                break
-        # Now process only lines after the marker
-        for i, line in enumerate(lines[start_idx:], start=start_idx):
-            if pattern not in line.lower():
-                continue
-
-            found_pattern = True
-            print(f"\nDEBUG: Found pattern '{pattern}' in line {i}: '{line}'")
-            parts = line.split()
-            print(f"DEBUG: Line parts: {parts}")
-            print(f"DEBUG: Number of parts: {len(parts)}")
-
-            if pattern == "educational attainment":
-                # Only parse if line starts with 'Educational Attainment' and has at least 6 parts
-                if line.lower().startswith("educational attainment") and len(parts) >= 6:
-                    try:
-                        rank_str = parts[2]  
-                        result["rank"] = int("".join(filter(str.isdigit, rank_str)))
-                        result["score"] = float(parts[3]) 
-                        break
-                    except (ValueError, IndexError) as e:
-                        print(f"Parsing error: {e}")
-                        print(f"Line: {line}")
-                        print(f"Parts: {parts}")
-
-            # Handle literacy format (fewer parts)
-            elif pattern == "literacy" and len(parts) >= 4:
-                try:
-                    rank_str = parts[2]  # "87th"
-                    result["rank"] = int("".join(filter(str.isdigit, rank_str)))
-                    result["score"] = float(parts[3])  # "0.977"
-                    # For literacy, diff, left, right are not available (shown as "-")
-                except (ValueError, IndexError) as e:
-                    print(f"Parsing error: {e}")
-                    print(f"Line: {line}")
-                    print(f"Parts: {parts}")
-
-            # Handle labour-force participation rate format
-            elif pattern == "labour-force participation rate" and len(parts) >= 9:
-                print(f"DEBUG: Processing labour-force participation rate with {len(parts)} parts")
-                try:
-                    # Based on the output we saw: ['Labour-force', 'participation', 'rate%', '104th', '0.679', '-19.90', '42.17', '62.07', '0-100']
-                    rank_str = parts[3]  # "104th"
-                    result["rank"] = int("".join(filter(str.isdigit, rank_str)))
-                    result["score"] = float(parts[4])  # "0.679"
-                    result["diff"] = float(parts[5])    # "-19.90"
-                    result["left"] = float(parts[6])    # "42.17"
-                    result["right"] = float(parts[7])   # "62.07"
-                    print(f"DEBUG: Successfully parsed - rank: {result['rank']}, score: {result['score']}, diff: {result['diff']}, left: {result['left']}, right: {result['right']}")
-                except (ValueError, IndexError) as e:
-                    print(f"Parsing error: {e}")
-                    print(f"Line: {line}")
-                    print(f"Parts: {parts}")
-                    # Try to parse the last part that might be causing issues
-                    if len(parts) > 8:
-                        print(f"DEBUG: Last part '{parts[8]}' might be causing the issue")
-
-            # Handle professional and technical workers format
-            elif pattern == "professional and technical workers" and len(parts) >= 10:
-                print(f"DEBUG: Processing professional and technical workers with {len(parts)} parts")
-                try:
-                    # Based on the output we saw: ['Professional', 'and', 'technical', 'workers%', '1st', '1.000', '2.04', '48.98', '51.02', '0-100']
-                    rank_str = parts[4]  # "1st"
-                    result["rank"] = int("".join(filter(str.isdigit, rank_str)))
-                    result["score"] = float(parts[5])  # "1.000"
-                    result["diff"] = float(parts[6])    # "2.04"
-                    result["left"] = float(parts[7])    # "48.98"
-                    result["right"] = float(parts[8])   # "51.02"
-                    print(f"DEBUG: Successfully parsed - rank: {result['rank']}, score: {result['score']}, diff: {result['diff']}, left: {result['left']}, right: {result['right']}")
-                except (ValueError, IndexError) as e:
-                    print(f"Parsing error: {e}")
-                    print(f"Line: {line}")
-                    print(f"Parts: {parts}")
-                    # Try to parse the last part that might be causing issues
-                    if len(parts) > 9:
-                        print(f"DEBUG: Last part '{parts[9]}' might be causing the issue")
-
-            # Handle legislators format
-            elif pattern == "legislators" and len(parts) >= 11:
-                print(f"DEBUG: Processing legislators with {len(parts)} parts")
-                try:
-                    # Based on the output we saw: ['Legislators,', 'senior', 'officials', 'and', 'managers%', '106th', '0.349', '-48.24', '25.88', '74.12', '0-100']
-                    rank_str = parts[5]  # "106th"
-                    result["rank"] = int("".join(filter(str.isdigit, rank_str)))
-                    result["score"] = float(parts[6])  # "0.349"
-                    result["diff"] = float(parts[7])    # "-48.24"
-                    result["left"] = float(parts[8])    # "25.88"
-                    result["right"] = float(parts[9])   # "74.12"
-                    print(f"DEBUG: Successfully parsed - rank: {result['rank']}, score: {result['score']}, diff: {result['diff']}, left: {result['left']}, right: {result['right']}")
-                except (ValueError, IndexError) as e:
-                    print(f"Parsing error: {e}")
-                    print(f"Line: {line}")
-                    print(f"Parts: {parts}")
-                    # Try to parse the last part that might be causing issues
-                    if len(parts) > 10:
-                        print(f"DEBUG: Last part '{parts[10]}' might be causing the issue")
-
-            # Handle wage equality format
-            elif pattern == "wage equality" and len(parts) >= 11:
-                print(f"DEBUG: Processing wage equality with {len(parts)} parts")
-                try:
-                    # Based on the output we saw: ['Wage', 'equality', 'for', 'similar', 'work1-7', '(best)', '109th', '0.579', '-', '-', '-']
-                    rank_str = parts[6]  # "109th"
-                    result["rank"] = int("".join(filter(str.isdigit, rank_str)))
-                    result["score"] = float(parts[7])  # "0.579"
-                    # For wage equality, diff, left, right are not available (shown as "-")
-                    if parts[8] != "-":
-                        result["diff"] = float(parts[8])
-                    if parts[9] != "-":
-                        result["left"] = float(parts[9])
-                    if parts[10] != "-":
-                        result["right"] = float(parts[10])
-                    print(f"DEBUG: Successfully parsed - rank: {result['rank']}, score: {result['score']}, diff: {result['diff']}, left: {result['left']}, right: {result['right']}")
-                except (ValueError, IndexError) as e:
-                    print(f"Parsing error: {e}")
-                    print(f"Line: {line}")
-                    print(f"Parts: {parts}")
-                    # Try to parse the last part that might be causing issues
-                    if len(parts) > 10:
-                        print(f"DEBUG: Last part '{parts[10]}' might be causing the issue")
-
-            # Handle earned income format
-            elif pattern == "earned income" and len(parts) >= 11:
-                print(f"DEBUG: Processing earned income with {len(parts)} parts")
-                try:
-                    # Based on the output we saw: ['Estimated', 'earned', "incomeint'l", '$', '1,000', '91st', '0.598', '-8.45', '12.58', '21.03', '0-150']
-                    rank_str = parts[5]  # "91st"
-                    result["rank"] = int("".join(filter(str.isdigit, rank_str)))
-                    result["score"] = float(parts[6])  # "0.598"
-                    result["diff"] = float(parts[7])    # "-8.45"
-                    result["left"] = float(parts[8])    # "12.58"
-                    result["right"] = float(parts[9])   # "21.03"
-                    print(f"DEBUG: Successfully parsed - rank: {result['rank']}, score: {result['score']}, diff: {result['diff']}, left: {result['left']}, right: {result['right']}")
-                except (ValueError, IndexError) as e:
-                    print(f"Parsing error: {e}")
-                    print(f"Line: {line}")
-                    print(f"Parts: {parts}")
-                    # Try to parse the last part that might be causing issues
-                    if len(parts) > 10:
-                        print(f"DEBUG: Last part '{parts[10]}' might be causing the issue")
-
-            # Handle economic participation summary format
-            elif pattern == "economic participation" and len(parts) >= 6 and line.lower().startswith("economic participation and opportunity"):
-                print(f"DEBUG: Processing economic participation summary with {len(parts)} parts")
-                try:
-                    rank_str = parts[4]  # "107th"
-                    result["rank"] = int("".join(filter(str.isdigit, rank_str)))
-                    result["score"] = float(parts[5])  # "0.620"
-                    # For summary, diff, left, right may be unavailable (shown as "-")
-                    if len(parts) > 6 and parts[6] != "-":
-                        result["diff"] = float(parts[6])
-                    if len(parts) > 7 and parts[7] != "-":
-                        result["left"] = float(parts[7])
-                    if len(parts) > 8 and parts[8] != "-":
-                        result["right"] = float(parts[8])
-                    print(f"DEBUG: Successfully parsed - rank: {result['rank']}, score: {result['score']}, diff: {result['diff']}, left: {result['left']}, right: {result['right']}")
-                    break
-                except (ValueError, IndexError) as e:
-                    print(f"Parsing error: {e}")
-                    print(f"Line: {line}")
-                    print(f"Parts: {parts}")
-                    if len(parts) > 8:
-                        print(f"DEBUG: Last part '{parts[8]}' might be causing the issue")
-                # Do not break here, continue to next line if parsing fails
-
-            # Handle education format (more parts)
-            elif len(parts) >= 9:
-                try:
-                    rank_str = parts[4]
-                    result["rank"] = int("".join(filter(str.isdigit, rank_str)))
-                    result["score"] = float(parts[5])
-                    result["diff"] = float(parts[6])
-                    result["left"] = float(parts[7])
-                    result["right"] = float(parts[8])
-                except (ValueError, IndexError) as e:
-                    print(f"Parsing error: {e}")
-                    print(f"Line: {line}")
-                    print(f"Parts: {parts}")
-            else:
-                print(
-                    f"Not enough parts in line (found {len(parts)}, need >=4 for literacy or >=9 for education)"
+# Ligatures that pdfplumber's extract_text expands
+LIGATURES = {
+    "ﬀ": "ff",
+    "ﬃ": "ffi",
+    "ﬄ": "ffl",
+    "ﬁ": "fi",
+    "ﬂ": "fl",
+    "ﬆ": "st",
+    "ﬅ": "st",
+}
+
+
+def _cluster(values, tolerance):
+    """Map sorted values to cluster numbers, chaining within tolerance."""
+    clusters = {}
+    n, last = -1, None
+    for value in sorted(set(values)):
+        if last is None or value > last + tolerance:
+            n += 1
+        clusters[value] = n
+        last = value
+    return clusters
+
+
+def chars_to_text(chars, x_tolerance=3, y_tolerance=3):
+    """Join characters into lines of words, the way pdfplumber does.
+
+    Characters are clustered into lines by their top, sorted by x0 within
+    each line and split into words at spaces and gaps wider than
+    x_tolerance; then the words are clustered into lines again by their top.
+
+    Args:
+        chars: list of (text, x0, x1, top) tuples in content-stream order
+        x_tolerance: largest gap within a word
+        y_tolerance: largest difference in top within a line
+
+    Returns:
+        string with one line per row of text
+    """
+    clusters = _cluster([char[3] for char in chars], y_tolerance)
+    lines = [[] for _ in range(len(set(clusters.values())))]
+    for char in chars:
+        lines[clusters[char[3]]].append(char)
+
+    words = []
+    for line in lines:
+        word = []
+        for char in sorted(line, key=lambda char: char[1]):
+            text, x0, _, top = char
+            if text.isspace():
+                new_word, char = True, None
+            elif word:
+                _, prev_x0, prev_x1, prev_top = word[-1]
+                new_word = (
+                    x0 < prev_x0
+                    or x0 > prev_x1 + x_tolerance
+                    or abs(top - prev_top) > y_tolerance
                 )
-            break
+            else:
+                new_word = False
+
+            if new_word and word:
+                text = "".join(LIGATURES.get(c[0], c[0]) for c in word)
+                words.append((text, min(c[3] for c in word)))
+                word = []
+            if char is not None:
+                word.append(char)
+        if word:
+            text = "".join(LIGATURES.get(c[0], c[0]) for c in word)
+            words.append((text, min(c[3] for c in word)))
+
+    clusters = _cluster([top for _, top in words], y_tolerance)
+    lines = [[] for _ in range(len(set(clusters.values())))]
+    for text, top in words:
+        lines[clusters[top]].append(text)
+    return "\n".join(" ".join(line) for line in lines)
+
+
+def _layout_chars(container, height, chars):
+    """Collect (text, x0, x1, top) for the characters in a layout tree."""
+    for item in container:
+        if isinstance(item, LTChar):
+            chars.append((item.get_text(), item.x0, item.x1, height - item.y1))
+        elif isinstance(item, LTContainer):
+            _layout_chars(item, height, chars)
+    return chars
+
+
+def read_page_text_pdfminer(page_number):
+    """Extract the text of one page of the report with pdfminer.six.
+
+    pdfminer runs with laparams=None, so it only interprets the first page's
+    content stream into characters, with no layout analysis; chars_to_text
+    then groups them into lines as pdfplumber's extract_text does.
+    """
+    with open(page_path(page_number), "rb") as fp:
+        page = next(PDFPage.get_pages(fp, pagenos=[0], maxpages=1))
+        resources = PDFResourceManager()
+        device = PDFPageAggregator(resources, laparams=None)
+        PDFPageInterpreter(resources, device).process_page(page)
+        layout = device.get_result()
+    return chars_to_text(_layout_chars(layout, layout.y1, []))
+
+
+# Functions that read the text of a page; pdfplumber is the reference
+TEXT_BACKENDS = {
+    "pdfplumber": read_page_text_pdfplumber,
+    "pdfminer": read_page_text_pdfminer,
+}
+DEFAULT_BACKEND = "pdfplumber"
+
+
+def read_page_text(page_number, backend=DEFAULT_BACKEND):
+    """Extract the text of one page of the report.
+
+    Args:
+        page_number: page of the report
+        backend: key in TEXT_BACKENDS
+
+    Returns:
+        string
+    """
+    return TEXT_BACKENDS[backend](page_number)
+
+
+def parse_country(lines):
+    """Get the country name from line 13 of a page, or None."""
+    # To get the country name, extract everything before the first digit
+    line13 = lines[13] if len(lines) > 13 else ""
+    country_name = COUNTRY_RE.match(line13)
+    if country_name:
+        country_name = country_name.group(1).strip()
+        country_name = PARENTHETICAL_RE.sub("", country_name).strip()
+        print(f"Extracted country: {country_name}")
+        return country_name
+
+    print("Debug - failed to find country name in line 13")
+    return None
+
+
+def parse_indicator_line(pattern, line, lower_line, result):
+    """Parse the values for one pattern from its line into result."""
+    parts = line.split()
+    print(f"DEBUG: Line parts: {parts}")
+    print(f"DEBUG: Number of parts: {len(parts)}")
+
+    if pattern == "educational attainment":
+        # Only parse if line starts with 'Educational Attainment' and has at least 6 parts
+        if lower_line.startswith("educational attainment") and len(parts) >= 6:
+            try:
+                rank_str = parts[2]  
+                result.rank = parse_rank(rank_str)
+                result.score = float(parts[3]) 
+                return
+            except (ValueError, IndexError) as e:
+                print(f"Parsing error: {e}")
+                print(f"Line: {line}")
+                print(f"Parts: {parts}")
+
+    # Handle literacy format (fewer parts)
+    elif pattern == "literacy" and len(parts) >= 4:
+        try:
+            rank_str = parts[2]  # "87th"
+            result.rank = parse_rank(rank_str)
+            result.score = float(parts[3])  # "0.977"
+            # For literacy, diff, left, right are not available (shown as "-")
+        except (ValueError, IndexError) as e:
+            print(f"Parsing error: {e}")
+            print(f"Line: {line}")
+            print(f"Parts: {parts}")
 
-        if not found_pattern:
-            print("Pattern not found in any line!")
-            print("Lines containing 'economic':")
-            for i, line in enumerate(lines):
-                if "economic" in line.lower():
-                    print(f"Line {i}: {line}")
-            print("Lines containing 'participation':")
-            for i, line in enumerate(lines):
-                if "participation" in line.lower():
-                    print(f"Line {i}: {line}")
+    # Handle labour-force participation rate format
+    elif pattern == "labour-force participation rate" and len(parts) >= 9:
+        print(f"DEBUG: Processing labour-force participation rate with {len(parts)} parts")
+        try:
+            # Based on the output we saw: ['Labour-force', 'participation', 'rate%', '104th', '0.679', '-19.90', '42.17', '62.07', '0-100']
+            rank_str = parts[3]  # "104th"
+            result.rank = parse_rank(rank_str)
+            result.score = float(parts[4])  # "0.679"
+            result.diff = float(parts[5])    # "-19.90"
+            result.left = float(parts[6])    # "42.17"
+            result.right = float(parts[7])   # "62.07"
+            print(f"DEBUG: Successfully parsed - rank: {result.rank}, score: {result.score}, diff: {result.diff}, left: {result.left}, right: {result.right}")
+        except (ValueError, IndexError) as e:
+            print(f"Parsing error: {e}")
+            print(f"Line: {line}")
+            print(f"Parts: {parts}")
+            # Try to parse the last part that might be causing issues
+            if len(parts) > 8:
+                print(f"DEBUG: Last part '{parts[8]}' might be causing the issue")
 
-    return result
+    # Handle professional and technical workers format
+    elif pattern == "professional and technical workers" and len(parts) >= 10:
+        print(f"DEBUG: Processing professional and technical workers with {len(parts)} parts")
+        try:
+            # Based on the output we saw: ['Professional', 'and', 'technical', 'workers%', '1st', '1.000', '2.04', '48.98', '51.02', '0-100']
+            rank_str = parts[4]  # "1st"
+            result.rank = parse_rank(rank_str)
+            result.score = float(parts[5])  # "1.000"
+            result.diff = float(parts[6])    # "2.04"
+            result.left = float(parts[7])    # "48.98"
+            result.right = float(parts[8])   # "51.02"
+            print(f"DEBUG: Successfully parsed - rank: {result.rank}, score: {result.score}, diff: {result.diff}, left: {result.left}, right: {result.right}")
+        except (ValueError, IndexError) as e:
+            print(f"Parsing error: {e}")
+            print(f"Line: {line}")
+            print(f"Parts: {parts}")
+            # Try to parse the last part that might be causing issues
+            if len(parts) > 9:
+                print(f"DEBUG: Last part '{parts[9]}' might be causing the issue")
+
+    # Handle legislators format
+    elif pattern == "legislators" and len(parts) >= 11:
+        print(f"DEBUG: Processing legislators with {len(parts)} parts")
+        try:
+            # Based on the output we saw: ['Legislators,', 'senior', 'officials', 'and', 'managers%', '106th', '0.349', '-48.24', '25.88', '74.12', '0-100']
+            rank_str = parts[5]  # "106th"
+            result.rank = parse_rank(rank_str)
+            result.score = float(parts[6])  # "0.349"
+            result.diff = float(parts[7])    # "-48.24"
+            result.left = float(parts[8])    # "25.88"
+            result.right = float(parts[9])   # "74.12"
+            print(f"DEBUG: Successfully parsed - rank: {result.rank}, score: {result.score}, diff: {result.diff}, left: {result.left}, right: {result.right}")
+        except (ValueError, IndexError) as e:
+            print(f"Parsing error: {e}")
+            print(f"Line: {line}")
+            print(f"Parts: {parts}")
+            # Try to parse the last part that might be causing issues
+            if len(parts) > 10:
+                print(f"DEBUG: Last part '{parts[10]}' might be causing the issue")
+
+    # Handle wage equality format
+    elif pattern == "wage equality" and len(parts) >= 11:
+        print(f"DEBUG: Processing wage equality with {len(parts)} parts")
+        try:
+            # Based on the output we saw: ['Wage', 'equality', 'for', 'similar', 'work1-7', '(best)', '109th', '0.579', '-', '-', '-']
+            rank_str = parts[6]  # "109th"
+            result.rank = parse_rank(rank_str)
+            result.score = float(parts[7])  # "0.579"
+            # For wage equality, diff, left, right are not available (shown as "-")
+            if parts[8] != "-":
+                result.diff = float(parts[8])
+            if parts[9] != "-":
+                result.left = float(parts[9])
+            if parts[10] != "-":
+                result.right = float(parts[10])
+            print(f"DEBUG: Successfully parsed - rank: {result.rank}, score: {result.score}, diff: {result.diff}, left: {result.left}, right: {result.right}")
+        except (ValueError, IndexError) as e:
+            print(f"Parsing error: {e}")
+            print(f"Line: {line}")
+            print(f"Parts: {parts}")
+            # Try to parse the last part that might be causing issues
+            if len(parts) > 10:
+                print(f"DEBUG: Last part '{parts[10]}' might be causing the issue")
+
+    # Handle earned income format
+    elif pattern == "earned income" and len(parts) >= 11:
+        print(f"DEBUG: Processing earned income with {len(parts)} parts")
+        try:
+            # Based on the output we saw: ['Estimated', 'earned', "incomeint'l", '$', '1,000', '91st', '0.598', '-8.45', '12.58', '21.03', '0-150']
+            rank_str = parts[5]  # "91st"
+            result.rank = parse_rank(rank_str)
+            result.score = float(parts[6])  # "0.598"
+            result.diff = float(parts[7])    # "-8.45"
+            result.left = float(parts[8])    # "12.58"
+            result.right = float(parts[9])   # "21.03"
+            print(f"DEBUG: Successfully parsed - rank: {result.rank}, score: {result.score}, diff: {result.diff}, left: {result.left}, right: {result.right}")
+        except (ValueError, IndexError) as e:
+            print(f"Parsing error: {e}")
+            print(f"Line: {line}")
+            print(f"Parts: {parts}")
+            # Try to parse the last part that might be causing issues
+            if len(parts) > 10:
+                print(f"DEBUG: Last part '{parts[10]}' might be causing the issue")
+
+    # Handle economic participation summary format
+    elif pattern == "economic participation" and len(parts) >= 6 and lower_line.startswith("economic participation and opportunity"):
+        print(f"DEBUG: Processing economic participation summary with {len(parts)} parts")
+        try:
+            rank_str = parts[4]  # "107th"
+            result.rank = parse_rank(rank_str)
+            result.score = float(parts[5])  # "0.620"
+            # For summary, diff, left, right may be unavailable (shown as "-")
+            if len(parts) > 6 and parts[6] != "-":
+                result.diff = float(parts[6])
+            if len(parts) > 7 and parts[7] != "-":
+                result.left = float(parts[7])
+            if len(parts) > 8 and parts[8] != "-":
+                result.right = float(parts[8])
+            print(f"DEBUG: Successfully parsed - rank: {result.rank}, score: {result.score}, diff: {result.diff}, left: {result.left}, right: {result.right}")
+            return
+        except (ValueError, IndexError) as e:
+            print(f"Parsing error: {e}")
+            print(f"Line: {line}")
+            print(f"Parts: {parts}")
+            if len(parts) > 8:
+                print(f"DEBUG: Last part '{parts[8]}' might be causing the issue")
+        # Do not return here, continue to next line if parsing fails
+
+    # Handle education format (more parts)
+    elif len(parts) >= 9:
+        try:
+            rank_str = parts[4]
+            result.rank = parse_rank(rank_str)
+            result.score = float(parts[5])
+            result.diff = float(parts[6])
+            result.left = float(parts[7])
+            result.right = float(parts[8])
+        except (ValueError, IndexError) as e:
+            print(f"Parsing error: {e}")
+            print(f"Line: {line}")
+            print(f"Parts: {parts}")
+    else:
+        print(
+            f"Not enough parts in line (found {len(parts)}, need >=4 for literacy or >=9 for education)"
+        )
+
+
+def extract_pdf_patterns(page_number, patterns, backend=DEFAULT_BACKEND):
+    """Extract data for several patterns from one page.
+
+    The page is read and lowercased once, and every pattern is found in a
+    single pass over its lines.
+
+    Args:
+        page_number: page of the report
+        patterns: sequence of patterns
+        backend: key in TEXT_BACKENDS
+
+    Returns:
+        dictionary mapping each pattern to a PageResult
+    """
+    text = read_page_text(page_number, backend)
+    lines = text.split("\n")
+    lower_lines = [line.lower() for line in lines]
+
+    # Try to extract country name, score, rank, and year from line 13
+    country_name = parse_country(lines)
+
+    results = {}
+    line_numbers = scan_lines(lower_lines, tuple(patterns))
+    for pattern, i in line_numbers.items():
+        result = PageResult(country=country_name, page_number=page_number)
+        results[pattern] = result
+        if i is None:
+            print(f"Pattern '{pattern}' not found in any line!")
+            for word in ["economic", "participation"]:
+                print(f"Lines containing '{word}':")
+                for j, lower_line in enumerate(lower_lines):
+                    if word in lower_line:
+                        print(f"Line {j}: {lines[j]}")
+            continue
+
+        print(f"\nDEBUG: Found pattern '{pattern}' in line {i}: '{lines[i]}'")
+        parse_indicator_line(pattern, lines[i], lower_lines[i], result)
+
+    return results
+
+
+def extract_pdf_data(page_number, pattern, backend=DEFAULT_BACKEND):
+    """Extract data from PDF using pdfplumber, print debug info, and return a PageResult."""
+    return extract_pdf_patterns(page_number, [pattern], backend)[pattern]
+
+
+# Country profile pages in the report
+REPORT_PAGES = range(83, 375, 2)
 
 
 def read_pdfs(pattern):
-    results = []
-    for page_number in range(83, 375, 2):
+    results = ResultColumns()
+    for page_number in REPORT_PAGES:
         print(f"Processing page {page_number}...")
         data = extract_pdf_data(page_number, pattern)
         results.append(data)
 
-    df = pd.DataFrame(results)
+    df = results.frame()
     return df
 
 
+# Range printed at the end of each indicator line; the default is 0-100
+VALUE_RANGES = {
+    "earned income": (0, 150),
+}
+
+# Values in the report are rounded to 2 decimals and scores to 3
+VALUE_ROUNDING = 0.005
+SCORE_ROUNDING = 0.0005
+
+
+def _monotone_mask(values):
+    """Mark a longest non-decreasing subsequence of values.
+
+    The elements left unmarked are the fewest that have to be removed to
+    make the sequence non-decreasing.
+    """
+    tails = []
+    tail_index = []
+    previous = [-1] * len(values)
+    for i, value in enumerate(values):
+        k = bisect.bisect_right(tails, value)
+        if k > 0:
+            previous[i] = tail_index[k - 1]
+        if k == len(tails):
+            tails.append(value)
+            tail_index.append(i)
+        else:
+            tails[k] = value
+            tail_index[k] = i
+
+    mask = [False] * len(values)
+    i = tail_index[-1] if tail_index else -1
+    while i >= 0:
+        mask[i] = True
+        i = previous[i]
+    return mask
+
+
+def validate_results(df, pattern):
+    """Check the extracted values against each other, for all pages at once.
+
+    Checks that apply to a row only when the values they need are present:
+    - parsed: rank and score were extracted
+    - diff: diff equals left - right, within rounding
+    - score: score equals min(left / right, 1), within the rounding of
+      left and right propagated through the ratio
+    - rank: the page is in the longest run of pages whose ranks increase
+      as their scores decrease, so a single bad value flags a single page
+    - range: score is in [0, 1] and left and right are in the printed range
+
+    Args:
+        df: DataFrame from read_pdfs
+        pattern: the pattern passed to read_pdfs
+
+    Returns:
+        DataFrame indexed like df, with a boolean column per check and 'ok'
+    """
+    score, diff = df["score"], df["diff"]
+    left, right = df["left"], df["right"]
+    has_values = left.notna() & right.notna()
+
+    checks = pd.DataFrame(index=df.index)
+    checks["page_number"] = df["page_number"]
+    checks["parsed"] = df["rank"].notna() & score.notna()
+
+    diff_error = (diff - (left - right)).abs()
+    checks["diff"] = ~(diff.notna() & has_values) | (diff_error <= 3 * VALUE_ROUNDING)
+
+    ratio = left / right
+    tolerance = SCORE_ROUNDING + VALUE_ROUNDING * (1 / right + left / right**2)
+    score_error = (score - ratio.clip(upper=1)).abs()
+    applies = has_values & (right > 0) & score.notna()
+    checks["score"] = ~applies | (score_error <= tolerance)
+
+    # Pages outside the longest run of ranks consistent with the score order
+    ranked = df[score.notna() & df["rank"].notna()]
+    ordered = ranked.sort_values(["score", "rank"], ascending=[False, True])
+    consistent = pd.Series(_monotone_mask(ordered["rank"].to_numpy()), ordered.index)
+    checks["rank"] = consistent.reindex(df.index, fill_value=True)
+
+    low, high = VALUE_RANGES.get(pattern, (0, 100))
+    in_range = score.isna() | score.between(0, 1)
+    for column in [left, right]:
+        in_range &= column.isna() | column.between(low, high)
+    checks["range"] = in_range
+
+    check_columns = ["parsed", "diff", "score", "rank", "range"]
+    checks["ok"] = checks[check_columns].all(axis=1)
+    return checks
+
+
+def failing_pages(checks):
+    """List the pages that failed any check in validate_results."""
+    return checks.loc[~checks["ok"], "page_number"].tolist()
+
+
+def reextract_pages(df, pattern, pages):
+    """Extract some pages again and replace their rows.
+
+    Args:
+        df: DataFrame from read_pdfs
+        pattern: pattern to search for
+        pages: list of page numbers
+
+    Returns:
+        new DataFrame
+    """
+    df = df.set_index("page_number", drop=False)
+    for page_number in pages:
+        print(f"Re-processing page {page_number}...")
+        data = extract_pdf_data(page_number, pattern)
+        df.loc[page_number, RESULT_FIELDS] = [getattr(data, name) for name in RESULT_FIELDS]
+    return df.reset_index(drop=True)
+
+
+def parse_pages(spec):
+    """Parse a page list like '83-101:2,117' into a list of page numbers.
+
+    Ranges include both ends; the optional step after ':' defaults to 1.
+    """
+    pages = []
+    for part in spec.split(","):
+        part, _, step = part.strip().partition(":")
+        start, _, stop = part.partition("-")
+        stop = stop or start
+        pages.extend(range(int(start), int(stop) + 1, int(step or 1)))
+    return pages
+
+
+def profile_pages(
+    pages, pattern, profiler=None, trace_memory=False, backend=DEFAULT_BACKEND
+):
+    """Extract pages, timing each one.
+
+    Args:
+        pages: list of page numbers
+        pattern: pattern to search for
+        profiler: optional cProfile.Profile, enabled while extracting
+        trace_memory: whether to record the tracemalloc peak for each page
+        backend: key in TEXT_BACKENDS
+
+    Returns:
+        tuple of the results DataFrame and a DataFrame of timings per page
+    """
+    results = ResultColumns()
+    timings = []
+    if trace_memory:
+        tracemalloc.start()
+
+    for page_number in pages:
+        print(f"\nProcessing page {page_number}...")
+        if trace_memory:
+            tracemalloc.reset_peak()
+        if profiler:
+            profiler.enable()
+        start = time.perf_counter()
+        data = extract_pdf_data(page_number, pattern, backend)
+        seconds = time.perf_counter() - start
+        if profiler:
+            profiler.disable()
+
+        timing = {"page_number": page_number, "seconds": seconds}
+        if trace_memory:
+            timing["peak_kb"] = tracemalloc.get_traced_memory()[1] / 1024
+        timings.append(timing)
+        results.append(data)
+
+    if trace_memory:
+        tracemalloc.stop()
+    return results.frame(), pd.DataFrame(timings)
+
+
+def check_backends(pages, patterns, backends=None):
+    """Check that text backends give the same parsed rows as pdfplumber.
+
+    Args:
+        pages: list of page numbers
+        patterns: sequence of patterns
+        backends: keys in TEXT_BACKENDS; by default, all of them
+
+    Returns:
+        DataFrame with one row per backend: seconds, the pages whose rows
+        differ from the reference, and whether it passes
+    """
+    backends = backends or list(TEXT_BACKENDS)
+    rows = {}
+    summary = []
+    for backend in [DEFAULT_BACKEND] + [b for b in backends if b != DEFAULT_BACKEND]:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            rows[backend] = {
+                page_number: extract_pdf_patterns(page_number, patterns, backend)
+                for page_number in pages
+            }
+        seconds = time.perf_counter() - start
+
+        mismatches = [
+            page_number
+            for page_number in pages
+            if rows[backend][page_number] != rows[DEFAULT_BACKEND][page_number]
+        ]
+        summary.append(
+            dict(
+                backend=backend,
+                seconds=seconds,
+                mismatches=mismatches,
+                ok=not mismatches,
+            )
+        )
+    return pd.DataFrame(summary).set_index("backend")
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Extract PDF data for a given pattern.")
     parser.add_argument('--run-all', action='store_true', help='Process all pages (default: False)')
     parser.add_argument('--pattern', type=str, default='professional and technical workers', help='Pattern to search for in the PDF')
+    parser.add_argument('--pages', type=parse_pages, default=None, help="Pages to process, like '83-101:2,117' (default: 117); not allowed with --run-all, which processes every page")
+    parser.add_argument('--profile', type=str, default=None, metavar='FILE', help='Write cProfile stats for the run to FILE and print the top functions')
+    parser.add_argument('--trace-memory', action='store_true', help='Record the tracemalloc peak for each page')
+    parser.add_argument('--slowest', type=int, default=10, help='Number of slowest pages to list (default: 10)')
+    parser.add_argument('--backend', choices=list(TEXT_BACKENDS), default=DEFAULT_BACKEND, help='Library that reads the page text (default: pdfplumber)')
+    parser.add_argument('--check-backends', action='store_true', help='Check that every backend gives the same rows as pdfplumber on the pages, and time them')
     args = parser.parse_args()
 
     pattern = args.pattern
     run_all = args.run_all
+    # --run-all writes wef_<pattern>.csv, which has to cover every page
+    if run_all and args.pages:
+        parser.error("--pages can't be combined with --run-all")
+    if args.pages:
+        pages = args.pages
+    elif run_all:
+        pages = REPORT_PAGES
+    else:
+        pages = [117]
+
+    if args.check_backends:
+        summary = check_backends(pages, [pattern])
+        print(summary.sort_values("seconds").to_string())
+        raise SystemExit(0 if summary["ok"].all() else 1)
+
+    profiler = cProfile.Profile() if args.profile else None
+    df, timings = profile_pages(pages, pattern, profiler, args.trace_memory, args.backend)
+
     if run_all:
-        df = read_pdfs(pattern)
         df.to_csv(f"wef_{pattern.replace(' ', '_')}.csv", index=False)
+
+        checks = validate_results(df, pattern)
+        failed = failing_pages(checks)
+        if failed:
+            print(f"\nValidation failed for {len(failed)} pages: {failed}")
+            print(checks[~checks["ok"]])
+        else:
+            print("\nAll pages passed validation")
     else:
-        # Process pages
-        results = []
-        for page_number in [117]:
-            print(f"\nProcessing page {page_number}...")
-            data = extract_pdf_data(page_number, pattern)
-            results.append(data)
-        df = pd.DataFrame(results)
         print("\nDataFrame of extracted results:")
         print(df)
+
+    total = timings["seconds"].sum()
+    print(f"\n{len(timings)} pages in {total:.2f} s")
+    print("Slowest pages:")
+    print(timings.nlargest(args.slowest, "seconds").to_string(index=False))
+
+    if profiler:
+        profiler.dump_stats(args.profile)
+        print(f"\nProfile written to {args.profile}")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
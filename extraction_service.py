@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""Local extraction service that shares work between notebook users.
+
+The server accepts extraction jobs over HTTP, on a TCP port or a Unix
+socket.  It runs the pages of each job on a shared process pool and streams
+progress back as newline-delimited JSON.  Identical requests that arrive
+while a job is running attach to the same job, and finished jobs are served
+from memory.
+
+Start the server:
+
+    python extraction_service.py --socket /tmp/extraction.sock
+
+and request a pattern from a notebook:
+
+    from extraction_service import request_extraction
+    df = request_extraction("legislators", socket_path="/tmp/extraction.sock")
+
+ExtractionService can also be used in-process with a stand-in extract
+function, which is how to exercise it without the report pages.
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+
+import pandas as pd
+
+from extract_pdf_data import REPORT_PAGES, extract_pdf_data
+
+
+class Job:
+    """One extraction job, with a log of progress events for subscribers."""
+
+    def __init__(self, pattern, pages):
+        self.pattern = pattern
+        self.pages = list(pages)
+        self.events = []
+        self.results = None
+        self.finished = False
+        self._changed = asyncio.Condition()
+
+    async def publish(self, event, finished=False):
+        """Append an event and wake up the subscribers."""
+        async with self._changed:
+            self.events.append(event)
+            self.finished = self.finished or finished
+            self._changed.notify_all()
+
+    async def stream(self):
+        """Yield every event of the job, from the first, until it finishes."""
+        i = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(
+                    lambda: len(self.events) > i or self.finished
+                )
+                events = self.events[i:]
+                finished = self.finished
+            for event in events:
+                yield event
+            i += len(events)
+            if finished and i == len(self.events):
+                return
+
+
+def parse_request(body):
+    """Read and check the JSON body of an extraction request.
+
+    Args:
+        body: bytes
+
+    Returns:
+        tuple of pattern and list of page numbers
+
+    Raises:
+        ValueError if the body is not a valid request
+    """
+    try:
+        params = json.loads(body or b"{}")
+    except ValueError as e:
+        raise ValueError(f"Request body is not JSON: {e}")
+    if not isinstance(params, dict):
+        raise ValueError("Request body must be a JSON object")
+
+    pattern = params.get("pattern")
+    if not isinstance(pattern, str) or not pattern:
+        raise ValueError("Request needs a 'pattern' string")
+
+    if "pages" not in params:
+        return pattern, list(REPORT_PAGES)
+    pages = params["pages"]
+    if not isinstance(pages, list) or not all(
+        isinstance(page, int) and not isinstance(page, bool) for page in pages
+    ):
+        raise ValueError("'pages' must be a list of page numbers")
+    return pattern, pages
+
+
+def _error_response(status, message):
+    """Make an HTTP error response with a JSON body."""
+    error = json.dumps(dict(error=message)).encode()
+    return (
+        f"HTTP/1.1 {status}\r\n".encode()
+        + b"Content-Type: application/json\r\n"
+        + f"Content-Length: {len(error)}\r\n".encode()
+        + b"Connection: close\r\n\r\n"
+        + error
+    )
+
+
+class ExtractionService:
+    """De-duplicating, caching front end to a process pool of extractors."""
+
+    def __init__(self, extract=extract_pdf_data, executor=None, max_workers=None):
+        """Make the service.
+
+        Args:
+            extract: function that takes (page_number, pattern) and returns a
+                PageResult, like extract_pdf_data
+            executor: concurrent.futures executor; by default, a process pool
+            max_workers: number of processes for the default executor
+        """
+        self.extract = extract
+        self.executor = executor or ProcessPoolExecutor(max_workers=max_workers)
+        self.jobs = {}
+        # The event loop only keeps weak references to tasks
+        self.tasks = set()
+
+    def submit(self, pattern, pages=REPORT_PAGES):
+        """Start a job, or return the running or finished job for the same request.
+
+        Requests for the same pages in any order, or with repeats, share a
+        job.
+
+        Args:
+            pattern: pattern to search for
+            pages: sequence of page numbers
+
+        Returns:
+            Job
+        """
+        pages = sorted(set(pages))
+        key = (pattern, tuple(pages))
+        job = self.jobs.get(key)
+        if job is None:
+            job = Job(pattern, pages)
+            self.jobs[key] = job
+            task = asyncio.create_task(self._run(key, job))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+        return job
+
+    async def _run(self, key, job):
+        loop = asyncio.get_running_loop()
+        futures = [
+            loop.run_in_executor(self.executor, self.extract, page, job.pattern)
+            for page in job.pages
+        ]
+        results = []
+        try:
+            for future in asyncio.as_completed(futures):
+                data = asdict(await future)
+                results.append(data)
+                await job.publish(
+                    dict(
+                        page=data["page_number"], done=len(results), total=len(futures)
+                    )
+                )
+        except Exception as e:
+            # Pages that haven't started are dropped
+            for future in futures:
+                future.cancel()
+            # Failed jobs are not cached, so the next request tries again
+            del self.jobs[key]
+            await job.publish(dict(error=repr(e)), finished=True)
+            return
+
+        job.results = sorted(results, key=lambda data: data["page_number"])
+        await job.publish(dict(results=job.results), finished=True)
+
+    async def handle(self, reader, writer):
+        """Serve one HTTP request: POST /extract with a JSON body."""
+        try:
+            request_line = (await reader.readline()).decode().split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode().strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = headers.get("content-length", "0")
+            if not length.isdigit():
+                message = f"Bad Content-Length: {length!r}"
+                writer.write(_error_response("400 Bad Request", message))
+                return
+            body = await reader.readexactly(int(length))
+
+            if request_line[:2] != ["POST", "/extract"]:
+                writer.write(b"HTTP/1.1 404 Not Found\r\nConnection: close\r\n\r\n")
+                return
+
+            try:
+                pattern, pages = parse_request(body)
+            except ValueError as e:
+                writer.write(_error_response("400 Bad Request", str(e)))
+                return
+            job = self.submit(pattern, pages)
+
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: application/x-ndjson\r\n"
+                b"Connection: close\r\n\r\n"
+            )
+            async for event in job.stream():
+                writer.write(json.dumps(event).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765, socket_path=None):
+        """Run the server until cancelled.
+
+        Args:
+            host: address to listen on
+            port: TCP port
+            socket_path: if given, listen on this Unix socket instead
+        """
+        if socket_path:
+            server = await asyncio.start_unix_server(self.handle, path=socket_path)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def request_extraction(
+    pattern, pages=None, host="127.0.0.1", port=8765, socket_path=None, verbose=True
+):
+    """Ask a running service for an extraction and wait for the results.
+
+    Uses a blocking socket, so it works inside a notebook's event loop.
+
+    Args:
+        pattern: pattern to search for
+        pages: sequence of page numbers; by default, every country page
+        host: server address
+        port: TCP port
+        socket_path: Unix socket of the server, instead of host and port
+        verbose: whether to print progress
+
+    Returns:
+        DataFrame like read_pdfs
+    """
+    params = dict(pattern=pattern)
+    if pages is not None:
+        params["pages"] = list(pages)
+    body = json.dumps(params).encode()
+
+    if socket_path:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(socket_path)
+    else:
+        sock = socket.create_connection((host, port))
+
+    with sock, sock.makefile("rb") as response:
+        sock.sendall(
+            b"POST /extract HTTP/1.1\r\n"
+            b"Content-Type: application/json\r\n"
+            + f"Content-Length: {len(body)}\r\n\r\n".encode()
+            + body
+        )
+        status = response.readline().decode()
+        if " 200 " not in status:
+            while response.readline().strip():
+                pass
+            detail = response.read().decode(errors="replace").strip()
+            raise RuntimeError(f"Extraction service returned {status.strip()} {detail}")
+        while response.readline().strip():
+            pass
+
+        for line in response:
+            event = json.loads(line)
+            if "error" in event:
+                raise RuntimeError(f"Extraction failed: {event['error']}")
+            if "results" in event:
+                return pd.DataFrame(event["results"])
+            if verbose:
+                print(f"Page {event['page']} ({event['done']}/{event['total']})")
+
+    raise RuntimeError("Extraction service closed the connection early")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve PDF extraction jobs.")
+    parser.add_argument(
+        "--host", type=str, default="127.0.0.1", help="Address to listen on"
+    )
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on")
+    parser.add_argument(
+        "--socket",
+        type=str,
+        default=None,
+        help="Unix socket to listen on instead of a port",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Number of worker processes"
+    )
+    args = parser.parse_args()
+
+    service = ExtractionService(max_workers=args.workers)
+    asyncio.run(service.serve(args.host, args.port, args.socket))
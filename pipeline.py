@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""Run the indicator notebooks' steps as a cached pipeline.
+
+Every indicator notebook does the same things: extract the indicator from
+the report, read it with read_wef_file, add the ratio and revised score,
+write the rank table and weights, and plot the revised scores.  Here those
+steps are stages in a DAG, one set per indicator in WEF_INDICATORS, plus
+the warehouse and the recomputed index, which depend on all of them.
+
+Each stage has a key, a hash of its code and the modules it calls, its
+parameters, the contents of its input files and the keys of the stages it
+depends on.  A stage runs only if its key changed since the last run or
+one of its outputs is missing or was modified; otherwise its outputs are
+reused.  Stages whose dependencies are done run in parallel in a process
+pool.
+
+    python pipeline.py                       # refresh whatever is stale
+    python pipeline.py --indicators legislators wage_equality --dry-run
+"""
+
+import argparse
+import glob
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from utils import (
+    WEF_INDICATORS,
+    add_revised_scores,
+    make_rank_table,
+    make_weight_table,
+    read_wef_file,
+)
+
+CACHE_DIR = ".pipeline_cache"
+
+# Labels each indicator notebook passes to make_weight_table
+WEIGHT_LABELS = {
+    "labour_participation": "primary",
+    "wage_equality": "professional",
+    "earned_income": "professional",
+    "legislators": "professional",
+    "professional_technical": "professional",
+    "primary_education": "primary",
+    "secondary_education": "secondary",
+    "tertiary_education": "tertiary",
+}
+
+
+@dataclass
+class Stage:
+    """One step of the pipeline."""
+
+    name: str
+    func: callable
+    params: dict = field(default_factory=dict)
+    deps: list = field(default_factory=list)
+    inputs: list = field(default_factory=list)
+    outputs: list = field(default_factory=list)
+    code_deps: list = field(default_factory=list)
+    output_patterns: list = field(default_factory=list)
+
+
+def stage_outputs(stage):
+    """List a stage's outputs, with the files that match its output patterns."""
+    matches = [glob.glob(pattern) for pattern in stage.output_patterns]
+    return list(stage.outputs) + sorted(path for paths in matches for path in paths)
+
+
+def file_hash(path):
+    """SHA-256 of a file's contents, or None if it doesn't exist."""
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for block in iter(lambda: fp.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def module_hash(name):
+    """SHA-256 of a module's source file, found without importing it."""
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.origin is None:
+        raise ValueError(f"Can't find the source of module {name}")
+    return file_hash(spec.origin)
+
+
+def stage_key(stage, dep_keys):
+    """Hash everything a stage's outputs depend on.
+
+    The stage function's own source is hashed, along with the source files
+    of the modules in code_deps, so editing a helper like add_revised_scores
+    makes the stages that use it stale.
+    """
+    digest = hashlib.sha256()
+    digest.update(inspect.getsource(stage.func).encode())
+    for name in sorted(stage.code_deps):
+        digest.update(f"{name}:{module_hash(name)}".encode())
+    digest.update(json.dumps(stage.params, sort_keys=True, default=str).encode())
+    for path in sorted(stage.inputs):
+        digest.update(f"{path}:{file_hash(path)}".encode())
+    for key in dep_keys:
+        digest.update(key.encode())
+    return digest.hexdigest()
+
+
+def _record_path(stage):
+    return os.path.join(CACHE_DIR, f"{stage.name}.json")
+
+
+def is_fresh(stage, key):
+    """Check whether a stage's recorded run matches its key and outputs."""
+    try:
+        with open(_record_path(stage)) as fp:
+            record = json.load(fp)
+    except (OSError, ValueError):
+        return False
+    if record["key"] != key:
+        return False
+    # A missing, changed or deleted output makes the stage stale
+    hashes = {path: file_hash(path) for path in stage_outputs(stage)}
+    return hashes == record["outputs"]
+
+
+def record_run(stage, key):
+    """Remember a stage's key and the hashes of its outputs."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    outputs = {path: file_hash(path) for path in stage_outputs(stage)}
+    record = dict(key=key, outputs=outputs)
+    with open(_record_path(stage), "w") as fp:
+        json.dump(record, fp, indent=2)
+
+
+# =============================================================================
+# Stage functions
+# =============================================================================
+
+
+def extract_stage(pattern, filename):
+    from extract_pdf_data import read_pdfs
+
+    # Like the notebooks, keep an existing CSV when the pages aren't here
+    if os.path.exists(filename) and not glob.glob("pages/page_*.pdf"):
+        return
+
+    df = read_pdfs(pattern)
+    df.to_csv(filename, index=False)
+
+
+def score_stage(filename, revised, scored):
+    df = read_wef_file(filename)
+    add_revised_scores(df, revised)
+    df.to_parquet(scored)
+
+
+def table_stage(label, scored, table, weights):
+    df = pd.read_parquet(scored)
+    make_rank_table(df).to_csv(table)
+    make_weight_table(df, label).to_csv(weights)
+
+
+def figure_stage(scored, prefix):
+    from utils.plotting import plot_revised_scores, render_dashboard
+
+    # Pages from an earlier run with more countries would look like outputs
+    for path in glob.glob(f"{prefix}_p[0-9][0-9].png"):
+        os.remove(path)
+
+    df = pd.read_parquet(scored)
+    dinged = df["score"] < 1
+    revised = df[~dinged].dropna(subset=["ratio"]).sort_values("revised_score")
+    render_dashboard(revised, plot_revised_scores, prefix)
+
+
+def warehouse_stage(path, indicators):
+    from utils.warehouse import IndicatorWarehouse
+
+    specs = {name: WEF_INDICATORS[name] for name in indicators}
+    IndicatorWarehouse.build(indicators=specs).save(path)
+
+
+def index_stage(warehouse, table):
+    from utils.gender_gap import GenderGapIndex
+    from utils.warehouse import IndicatorWarehouse
+
+    GenderGapIndex(IndicatorWarehouse.load(warehouse)).compare().to_csv(table)
+
+
+# =============================================================================
+# DAG
+# =============================================================================
+
+
+def build_stages(indicators=None):
+    """Make the stages for some indicators and the aggregates that use them.
+
+    Args:
+        indicators: list of names in WEF_INDICATORS; by default, all of them
+
+    Returns:
+        dictionary mapping stage names to Stages
+    """
+    indicators = indicators or list(WEF_INDICATORS)
+    pages = sorted(glob.glob("pages/page_*.pdf"))
+    stages = []
+
+    for name in indicators:
+        spec = WEF_INDICATORS[name]
+        scored = os.path.join(CACHE_DIR, f"{name}_scored.parquet")
+        weights = os.path.join(CACHE_DIR, f"{name}_weights.csv")
+        prefix = f"figures/{name}_revised_scores"
+        stages += [
+            Stage(
+                f"{name}.extract",
+                extract_stage,
+                dict(pattern=spec["pattern"], filename=spec["filename"]),
+                inputs=pages,
+                outputs=[spec["filename"]],
+                code_deps=["extract_pdf_data"],
+            ),
+            Stage(
+                f"{name}.score",
+                score_stage,
+                dict(filename=spec["filename"], revised=spec["revised"], scored=scored),
+                deps=[f"{name}.extract"],
+                inputs=[spec["filename"]],
+                outputs=[scored],
+                code_deps=["utils"],
+            ),
+            Stage(
+                f"{name}.table",
+                table_stage,
+                dict(
+                    label=WEIGHT_LABELS[name],
+                    scored=scored,
+                    table=spec["table"],
+                    weights=weights,
+                ),
+                deps=[f"{name}.score"],
+                inputs=[scored],
+                outputs=[spec["table"], weights],
+                code_deps=["utils"],
+            ),
+            Stage(
+                f"{name}.figures",
+                figure_stage,
+                dict(scored=scored, prefix=prefix),
+                deps=[f"{name}.score"],
+                inputs=[scored],
+                outputs=[f"{prefix}.png", f"{prefix}_thumb.png"],
+                output_patterns=[f"{prefix}_p[0-9][0-9].png"],
+                code_deps=["utils", "utils.plotting"],
+            ),
+        ]
+
+    warehouse = "wef_warehouse.parquet"
+    stages += [
+        Stage(
+            "warehouse",
+            warehouse_stage,
+            dict(path=warehouse, indicators=indicators),
+            deps=[f"{name}.extract" for name in indicators],
+            inputs=[WEF_INDICATORS[name]["filename"] for name in indicators],
+            outputs=[warehouse],
+            code_deps=["utils", "utils.warehouse"],
+        ),
+        Stage(
+            "index",
+            index_stage,
+            dict(warehouse=warehouse, table="gggi_revised_table.csv"),
+            deps=["warehouse"],
+            inputs=[warehouse],
+            outputs=["gggi_revised_table.csv"],
+            code_deps=["utils.gender_gap", "utils.warehouse"],
+        ),
+    ]
+    return {stage.name: stage for stage in stages}
+
+
+def _run_stage(stage):
+    stage.func(**stage.params)
+
+
+def run_pipeline(stages, max_workers=None, force=False, dry_run=False):
+    """Run the stale stages, in dependency order, in parallel where possible.
+
+    A stage's key depends on its inputs' contents, so it is computed only
+    once its dependencies have run.
+
+    Args:
+        stages: dictionary from build_stages
+        max_workers: number of worker processes
+        force: run every stage, even if fresh
+        dry_run: report which stages would run without running them;
+            stages downstream of a stale stage count as stale
+
+    Returns:
+        dictionary mapping stage names to 'ran', 'cached' or 'stale'
+    """
+    status = {}
+    keys = {}
+    pending = dict(stages)
+    running = {}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            ready = [
+                stage
+                for stage in pending.values()
+                if all(dep in status for dep in stage.deps)
+            ]
+            for stage in ready:
+                del pending[stage.name]
+                upstream_stale = any(status[dep] == "stale" for dep in stage.deps)
+                key = stage_key(stage, [keys[dep] for dep in stage.deps])
+                keys[stage.name] = key
+
+                if not force and not upstream_stale and is_fresh(stage, key):
+                    status[stage.name] = "cached"
+                    print(f"{stage.name}: up to date")
+                elif dry_run:
+                    status[stage.name] = "stale"
+                    print(f"{stage.name}: would run")
+                else:
+                    print(f"{stage.name}: running")
+                    running[executor.submit(_run_stage, stage)] = stage
+
+            if not running:
+                if pending and not ready:
+                    raise ValueError(f"Unknown dependencies in {sorted(pending)}")
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                future.result()
+                record_run(stage, keys[stage.name])
+                status[stage.name] = "ran"
+                print(f"{stage.name}: done")
+
+    return status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh the indicator outputs.")
+    parser.add_argument(
+        "--indicators",
+        nargs="+",
+        default=None,
+        choices=list(WEF_INDICATORS),
+        help="Indicators to process (default: all)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Number of worker processes"
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Run every stage, even if up to date"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="List the stages that would run"
+    )
+    args = parser.parse_args()
+
+    stages = build_stages(args.indicators)
+    status = run_pipeline(stages, args.workers, args.force, args.dry_run)
+    counts = pd.Series(status).value_counts()
+    print(counts.to_string())
@@ -0,0 +1,193 @@
+"""Memory-mapped buffer for extraction results from parallel workers.
+
+Instead of returning a pickled dictionary per page, each worker writes its
+page's numbers into its own slot of a memory-mapped file, which lives in
+/dev/shm where that exists.  The parent then wraps the buffer as a
+DataFrame without copying the numbers.
+
+The buffer holds, with one row per slot, a float64 array of the columns in
+ResultColumns.FLOAT_FIELDS, an int64 array of ResultColumns.INT_FIELDS with
+a mask of missing values, an int32 array of country ids, and the country
+names as fixed-width UTF-8.  A country id is the position of the country's
+ISO code in COUNTRY_CODES, or -1 if the name could not be resolved.
+
+Example:
+
+    df = read_pdfs_parallel("legislators")
+"""
+
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from extract_pdf_data import (
+    REPORT_PAGES,
+    RESULT_FIELDS,
+    ResultColumns,
+    extract_pdf_data,
+)
+from utils import code_to_wef_country, country_resolver
+
+FLOAT_COLUMNS = ResultColumns.FLOAT_FIELDS
+INT_COLUMNS = ResultColumns.INT_FIELDS
+
+# Bytes per country name; longer names are truncated
+NAME_SIZE = 96
+
+COUNTRY_CODES = sorted(code_to_wef_country)
+COUNTRY_IDS = {code: i for i, code in enumerate(COUNTRY_CODES)}
+
+# Memory-backed on Linux; elsewhere, the default temporary directory
+BUFFER_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# Buffers attached in this process, by path
+_attached = {}
+
+
+class ResultsBuffer:
+    """Fixed-column extraction results in a memory-mapped file."""
+
+    def __init__(self, n_slots, path=None):
+        """Create a new buffer, or attach to an existing one.
+
+        Args:
+            n_slots: number of result rows
+            path: file of an existing buffer; by default, creates one
+        """
+        self.n_slots = n_slots
+        layout = [
+            ("floats", np.float64, (n_slots, len(FLOAT_COLUMNS))),
+            ("ints", np.int64, (n_slots, len(INT_COLUMNS))),
+            ("country_ids", np.int32, (n_slots,)),
+            ("missing", np.bool_, (n_slots, len(INT_COLUMNS))),
+            ("names", f"S{NAME_SIZE}", (n_slots,)),
+        ]
+        offsets = []
+        size = 0
+        for _, dtype, shape in layout:
+            offsets.append(size)
+            size += np.dtype(dtype).itemsize * int(np.prod(shape))
+
+        self.owner = path is None
+        if self.owner:
+            fd, path = tempfile.mkstemp(
+                prefix="results_", suffix=".buf", dir=BUFFER_DIR
+            )
+            os.ftruncate(fd, size)
+            os.close(fd)
+        self.path = path
+
+        for (name, dtype, shape), offset in zip(layout, offsets):
+            array = np.memmap(path, dtype=dtype, mode="r+", offset=offset, shape=shape)
+            setattr(self, name, array)
+        if self.owner:
+            self.floats[:] = np.nan
+            self.missing[:] = True
+            self.country_ids[:] = -1
+
+    def __reduce__(self):
+        # Workers receive the path and attach, rather than a copy of the data
+        return (_attach_buffer, (self.path, self.n_slots))
+
+    def write(self, slot, result):
+        """Store one PageResult, like the ones from extract_pdf_data.
+
+        Args:
+            slot: row to write
+            result: PageResult
+        """
+        for j, column in enumerate(FLOAT_COLUMNS):
+            value = getattr(result, column)
+            self.floats[slot, j] = np.nan if value is None else value
+        for j, column in enumerate(INT_COLUMNS):
+            value = getattr(result, column)
+            self.ints[slot, j] = 0 if value is None else value
+            self.missing[slot, j] = value is None
+
+        code = None
+        if result.country is not None:
+            code = country_resolver.lookup(result.country)
+            self.names[slot] = result.country.encode()[:NAME_SIZE]
+        self.country_ids[slot] = COUNTRY_IDS.get(code, -1)
+
+    def frame(self):
+        """Wrap the buffer as a DataFrame.
+
+        The numeric columns are views of the mapped file, so the frame sees
+        later writes; copy it to keep a snapshot.  The country names are
+        decoded into a new column.
+
+        Returns:
+            DataFrame with a 'code' categorical and the columns of read_pdfs
+        """
+        names = [name.decode(errors="ignore") or None for name in self.names.tolist()]
+        columns = {"country": pd.Series(names, dtype=object)}
+        for j, column in enumerate(FLOAT_COLUMNS):
+            columns[column] = self.floats[:, j]
+        for j, column in enumerate(INT_COLUMNS):
+            columns[column] = pd.arrays.IntegerArray(
+                self.ints[:, j], self.missing[:, j], copy=False
+            )
+        columns = {name: columns[name] for name in RESULT_FIELDS}
+        df = pd.DataFrame(columns, copy=False)
+
+        codes = pd.Categorical.from_codes(self.country_ids, categories=COUNTRY_CODES)
+        df.insert(0, "code", codes)
+        return df
+
+    def close(self):
+        """Release this buffer's mapping, and remove the file if it owns it.
+
+        Frames from frame() keep their own references, so on POSIX systems
+        they stay valid after the file is removed; the memory is released
+        when the last of them is garbage collected.
+        """
+        self.floats = self.ints = self.missing = None
+        self.country_ids = self.names = None
+        if self.owner:
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _attach_buffer(path, n_slots):
+    """Attach to a buffer, once per process."""
+    if path not in _attached:
+        _attached[path] = ResultsBuffer(n_slots, path=path)
+    return _attached[path]
+
+
+def _extract_into(buffer, slot, page_number, pattern):
+    buffer.write(slot, extract_pdf_data(page_number, pattern))
+
+
+def read_pdfs_parallel(pattern, pages=REPORT_PAGES, max_workers=None):
+    """Extract pages in parallel into a shared buffer.
+
+    The numeric columns of the result are views of the buffer, not copies.
+
+    Args:
+        pattern: pattern to search for
+        pages: sequence of page numbers
+        max_workers: number of worker processes
+
+    Returns:
+        DataFrame like read_pdfs, with the country codes added
+    """
+    pages = list(pages)
+    with ResultsBuffer(len(pages)) as buffer:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_extract_into, buffer, slot, page, pattern)
+                for slot, page in enumerate(pages)
+            ]
+            for future in futures:
+                future.result()
+        return buffer.frame()
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import bin_codes, round_into_bins
+
+
+def reference_round_into_bins(series, bin_width, low=0, high=None):
+    """round_into_bins as it was before bin_codes."""
+    if high is None:
+        high = series.max()
+    bins = np.arange(low, high + bin_width, bin_width)
+    indices = np.digitize(series, bins)
+    result = pd.Series(bins[indices - 1], index=series.index, dtype="float")
+    result[series.isna()] = np.nan
+    return result
+
+
+def test_decimal_width():
+    series = pd.Series([0.3, 0.7, 85.5, 1.2])
+    result = round_into_bins(series, 0.1)
+    pd.testing.assert_series_equal(result, reference_round_into_bins(series, 0.1))
+    assert result[2] == pytest.approx(85.5)
+
+
+@pytest.mark.parametrize("bin_width", [0.1, 0.25, 2.5, 3])
+def test_matches_reference(bin_width):
+    rng = np.random.default_rng(1)
+    series = pd.Series(np.round(rng.uniform(0, 100, 2000), 1))
+    series[::17] = np.nan
+    expected = reference_round_into_bins(series, bin_width)
+    pd.testing.assert_series_equal(round_into_bins(series, bin_width), expected)
+
+
+def test_high_not_a_multiple():
+    series = pd.Series([0, 6, 7, 29, 30, 34, 35, 36])
+    result = round_into_bins(series, 7, high=30)
+    pd.testing.assert_series_equal(
+        result, reference_round_into_bins(series, 7, high=30)
+    )
+    assert list(result) == [0, 0, 7, 28, 28, 28, 35, 35]
+
+
+def test_codes():
+    series = pd.Series([-1, 0.05, 0.1, np.nan, 5], name="x")
+    binned = bin_codes(series, 0.1, high=0.15)
+    assert binned.name == "x"
+    assert list(binned.cat.codes) == [0, 0, 1, -1, 2]
+    np.testing.assert_allclose(binned.cat.categories, [0, 0.1, 0.2])
+
+
+@pytest.mark.parametrize(
+    "bin_width, low, high",
+    [(0.1, 0, 85.5), (0.3, -2.5, 7.1), (2.5, 10, 97), (7, 0, 30)],
+)
+def test_codes_match_digitize_on_edges(bin_width, low, high):
+    # Values on and next to each edge are where dividing by the width can
+    # land one bin off
+    edges = np.arange(low, high + bin_width, bin_width)
+    values = np.concatenate(
+        [edges, np.nextafter(edges, -np.inf), np.nextafter(edges, np.inf)]
+    )
+    values = np.append(values, [low - 1, high + 10 * bin_width, np.inf, np.nan])
+    series = pd.Series(values)
+
+    expected = np.clip(np.digitize(values, edges) - 1, 0, len(edges) - 1)
+    expected[np.isnan(values)] = -1
+    codes = bin_codes(series, bin_width, low, high).cat.codes
+    np.testing.assert_array_equal(codes, expected)
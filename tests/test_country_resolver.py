@@ -0,0 +1,45 @@
+import gc
+import weakref
+
+import pandas as pd
+import pytest
+
+from utils import CountryResolver
+
+CODES = {"CIV": "Côte d'Ivoire", "ISL": "Iceland", "KOR": "Korea, Rep."}
+ALIASES = {"South Korea": "KOR"}
+
+
+def test_exact_and_alias_lookups():
+    resolver = CountryResolver(CODES, ALIASES)
+    codes = resolver.resolve(["Iceland", "south korea", "ISL", "Cote d'Ivoire"])
+    assert list(codes) == ["ISL", "KOR", "ISL", "CIV"]
+    assert resolver.fuzzy_matches == {}
+
+
+def test_fuzzy_matches_are_recorded_and_reported():
+    resolver = CountryResolver(CODES, ALIASES)
+    with pytest.warns(UserWarning, match="Fuzzy-matched.*Icelnd"):
+        codes = resolver.resolve(pd.Series(["Icelnd", "Iceland"]))
+    assert list(codes) == ["ISL", "ISL"]
+    assert resolver.fuzzy_matches == {"Icelnd": "iceland"}
+
+
+def test_unmatched_names():
+    resolver = CountryResolver(CODES)
+    with pytest.raises(ValueError, match="Atlantis"):
+        resolver.resolve(["Atlantis"], errors="raise")
+
+
+def test_caches_are_per_instance():
+    first = CountryResolver(CODES)
+    second = CountryResolver({"ISL": "Iceland"})
+    assert first.lookup("Cote dIvoir") == "CIV"
+    assert second.lookup("Cote dIvoir") is None
+    assert "Cote dIvoir" not in second.fuzzy_matches
+
+    # Nothing outside the resolver keeps it alive
+    ref = weakref.ref(first)
+    del first
+    gc.collect()
+    assert ref() is None
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from utils.density import clear_cache, kde_curves
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_cache()
+
+
+def test_degenerate_series_are_skipped():
+    rng = np.random.default_rng(3)
+    series = {
+        "normal": rng.normal(0, 1, 500),
+        "empty": [],
+        "missing": [np.nan, np.nan],
+        "single": [0.5],
+        "equal": [0.2, 0.2, 0.2],
+    }
+    curves = kde_curves(series)
+
+    assert list(curves.columns) == list(series)
+    assert curves["normal"].notna().all()
+    for key in ["empty", "missing", "single", "equal"]:
+        assert curves[key].isna().all()
+
+    # The density integrates to about 1 over the range of the sample
+    area = np.trapezoid(curves["normal"], curves.index)
+    assert area == pytest.approx(1, abs=0.05)
+
+
+def test_only_degenerate_series():
+    curves = kde_curves({"single": [1.0], "equal": [2.0, 2.0]})
+    assert curves.empty
+    assert list(curves.columns) == ["single", "equal"]
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import (
+    estimate_ordinal,
+    estimate_proportion_wilson,
+    ordinal_age_gender_map,
+    ordinal_gender_map,
+)
+
+GENDER_MAP = {1: "Male", 2: "Female"}
+AGE_MAP = {1: "18-44", 2: "45+"}
+
+
+@pytest.fixture
+def survey():
+    rng = np.random.default_rng(5)
+    n = 400
+    return pd.DataFrame(
+        dict(
+            item=rng.integers(1, 4, n),
+            gender=rng.choice(list(GENDER_MAP), n),
+            age=rng.choice(list(AGE_MAP), n),
+            weight=rng.lognormal(0, 0.5, n),
+        )
+    )
+
+
+def test_wilson_proportion(survey):
+    success = survey["item"] == 1
+    p, lower, upper = estimate_proportion_wilson(success, survey["weight"])
+    expected = survey["weight"][success].sum() / survey["weight"].sum()
+    assert p == pytest.approx(expected)
+    assert lower < p < upper
+
+
+def test_ordinal_default_confidence_level(survey):
+    success = survey["item"] >= 2
+    _, lower, upper = estimate_proportion_wilson(success, survey["weight"], 0.95)
+
+    row = estimate_ordinal(survey, "item", [2], cumulative=True).iloc[0]
+    assert (row["lower"], row["upper"]) == pytest.approx((lower, upper))
+
+    narrow = estimate_ordinal(survey, "item", [2], True, confidence_level=0.84)
+    assert narrow["lower"].iloc[0] > lower
+
+
+def test_ordinal_maps(survey):
+    by_gender = ordinal_gender_map(survey, GENDER_MAP, "item", [1, 2, 3])
+    assert len(by_gender) == len(GENDER_MAP) * 3
+
+    by_age = ordinal_age_gender_map(survey, AGE_MAP, GENDER_MAP, "item", [1, 2, 3])
+    assert len(by_age) == len(AGE_MAP) * len(GENDER_MAP) * 3
+    assert by_age["proportion"].sum() == pytest.approx(1)
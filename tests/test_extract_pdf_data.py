@@ -0,0 +1,220 @@
+import os
+import re
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+import extract_pdf_data
+from extract_pdf_data import (
+    MARKER,
+    PatternMatcher,
+    RESULT_FIELDS,
+    TEXT_BACKENDS,
+    PageResult,
+    ResultColumns,
+    check_backends,
+    failing_pages,
+    read_page_text,
+    reextract_pages,
+    scan_lines,
+    validate_results,
+)
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(__file__)), "extract_pdf_data.py")
+
+
+def test_run_all_refuses_pages(tmp_path):
+    args = [sys.executable, SCRIPT, "--run-all", "--pages", "83", "--pattern", "x"]
+    result = subprocess.run(args, cwd=tmp_path, capture_output=True, text=True)
+    assert result.returncode == 2
+    assert "--pages can't be combined with --run-all" in result.stderr
+    assert not list(tmp_path.iterdir())
+
+
+def good_result(page_number, rank, left, right):
+    """A PageResult whose values agree with each other."""
+    score = round(min(left / right, 1), 3)
+    return PageResult(
+        f"Country{page_number}",
+        page_number,
+        score,
+        rank,
+        round(left - right, 2),
+        left,
+        right,
+    )
+
+
+# Pages in rank order, so the scores decrease
+GOOD = {
+    83: (1, 50.0, 48.0),
+    85: (2, 45.0, 50.0),
+    87: (3, 40.0, 50.0),
+    89: (4, 35.0, 50.0),
+    91: (5, 30.0, 50.0),
+    93: (6, 25.0, 50.0),
+    95: (7, 20.0, 50.0),
+}
+
+
+def make_results(bad):
+    results = ResultColumns()
+    for page_number, (rank, left, right) in GOOD.items():
+        result = bad.get(page_number) or good_result(page_number, rank, left, right)
+        results.append(result)
+    return results.frame()
+
+
+BAD = {
+    # diff doesn't equal left - right
+    85: PageResult("Country85", 85, 0.9, 2, -15.0, 45.0, 50.0),
+    # score doesn't match left / right
+    87: PageResult("Country87", 87, 0.85, 3, -10.0, 40.0, 50.0),
+    # rank out of order with the scores
+    89: PageResult("Country89", 89, 0.7, 6, -15.0, 35.0, 50.0),
+    # left and right outside the printed range
+    91: PageResult("Country91", 91, 0.6, 5, -80.0, 120.0, 200.0),
+    # nothing parsed
+    93: PageResult("Country93", 93),
+}
+
+
+def test_validate_flags_inconsistent_pages():
+    checks = validate_results(make_results(BAD), "legislators")
+    failed = checks.set_index("page_number")
+    assert failing_pages(checks) == [85, 87, 89, 91, 93]
+
+    assert not failed.loc[85, "diff"]
+    assert not failed.loc[87, "score"]
+    assert not failed.loc[89, "rank"]
+    assert not failed.loc[91, "range"]
+    assert not failed.loc[93, "parsed"]
+
+    # Each bad page fails only its own check
+    check_columns = ["parsed", "diff", "score", "rank", "range"]
+    for page_number in BAD:
+        assert failed.loc[page_number, check_columns].sum() == len(check_columns) - 1
+    assert failed.loc[[83, 95], "ok"].all()
+
+
+def test_reextract_fixes_failing_pages(monkeypatch):
+    df = make_results(BAD)
+    calls = []
+
+    def extract(page_number, pattern):
+        calls.append(page_number)
+        return good_result(page_number, *GOOD[page_number])
+
+    monkeypatch.setattr(extract_pdf_data, "extract_pdf_data", extract)
+    failed = failing_pages(validate_results(df, "legislators"))
+    fixed = reextract_pages(df, "legislators", failed)
+
+    assert calls == failed
+    assert validate_results(fixed, "legislators")["ok"].all()
+    assert list(fixed.columns) == RESULT_FIELDS
+    pd.testing.assert_frame_equal(fixed, make_results({}))
+
+
+MARKER_LINE = "Global Gender Gap Index indicators"
+
+SAMPLE_LINES = [
+    "Labour-force participation rate% 104th 0.679 -19.90 42.17 62.07 0-100",
+    "Wage equality for similar work1-7 (best) 109th 0.579 - - -",
+    "Legislators, senior officials and managers% 106th 0.349 -48.24 25.88 74.12 0-100",
+    "Economic Participation and Opportunity 4 107th 0.620 - - -",
+    "Educational Attainment 2 3rd 0.990 - - -",
+    "Literacy rate% 87th 0.977 - - - 0-100",
+    "Enrolment in primary education% 12th 0.998 -0.20 95.10 95.30 0-100",
+    "Enrolment in secondary education% 1st 1.000 2.20 80.10 77.90 0-100",
+    "Enrolment in tertiary education% 1st 1.000 20.20 60.10 39.90 0-100",
+]
+
+# Overlapping patterns: some are substrings of others or share prefixes
+PATTERNS = (
+    "education",
+    "primary education",
+    "educational attainment",
+    "economic participation",
+    "economic participation and opportunity",
+    "participation",
+    "literacy",
+    "legislators",
+    "wage equality",
+    "ation",
+)
+
+
+def reference_line(lines, pattern):
+    """The line the per-pattern loop parsed: the first match after the marker."""
+    start_idx = 0
+    for i, line in enumerate(lines):
+        if re.search(re.escape(MARKER), line.lower()):
+            start_idx = i + 1
+            break
+    for i, line in enumerate(lines[start_idx:], start=start_idx):
+        if re.search(re.escape(pattern), line.lower()):
+            return i
+    return None
+
+
+def random_page(rng):
+    """Shuffle sample lines, with zero, one or two markers anywhere."""
+    lines = [f"header {i}" for i in range(3)] + list(SAMPLE_LINES)
+    lines = list(rng.choice(lines, size=rng.integers(0, 15)))
+    for _ in range(rng.integers(0, 3)):
+        lines.insert(rng.integers(0, len(lines) + 1), MARKER_LINE)
+    return lines
+
+
+def test_scan_lines_matches_per_pattern_loop():
+    rng = np.random.default_rng(2)
+    for _ in range(300):
+        lines = random_page(rng)
+        lower_lines = [line.lower() for line in lines]
+        expected = {pattern: reference_line(lines, pattern) for pattern in PATTERNS}
+        assert scan_lines(lower_lines, PATTERNS) == expected
+
+
+def test_find_lines_matches_naive_search():
+    matcher = PatternMatcher(PATTERNS + ("aa", "aaa"))
+    lines = [line.lower() for line in SAMPLE_LINES] + ["aaaa", "", "xaay"]
+    found = matcher.find_lines(lines)
+    for pattern, indexes in zip(matcher.patterns, found):
+        assert indexes == [i for i, line in enumerate(lines) if pattern in line]
+
+
+def test_page_without_marker():
+    lines = [line.lower() for line in SAMPLE_LINES]
+    found = scan_lines(lines, ("literacy", "tertiary education", "missing"))
+    assert found == {"literacy": 5, "tertiary education": 8, "missing": None}
+
+
+def write_page(page_number, lines, x=0.05, fontsize=9):
+    """Write a one-page PDF of text lines where page_path looks for it."""
+    fig = Figure(figsize=(8.5, 11))
+    for i, line in enumerate(lines):
+        fig.text(x, 0.95 - i * 0.03, line, fontsize=fontsize)
+    # A second column that shares a line with the first
+    fig.text(0.7, 0.95 - 2 * 0.03, "Score", fontsize=fontsize)
+    fig.savefig(extract_pdf_data.page_path(page_number))
+
+
+def test_backends_read_the_same_text(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pages").mkdir()
+    lines = ["Header"] * 2 + [MARKER_LINE] + SAMPLE_LINES + ["Office staff efficiency"]
+    write_page(83, lines)
+    write_page(84, lines[::-1], x=0.1, fontsize=7)
+
+    for page_number in [83, 84]:
+        texts = {
+            backend: read_page_text(page_number, backend) for backend in TEXT_BACKENDS
+        }
+        assert SAMPLE_LINES[0] + "\n" in texts["pdfplumber"]
+        assert texts["pdfminer"] == texts["pdfplumber"]
+
+    summary = check_backends([83, 84], ["literacy", "tertiary education"])
+    assert summary["ok"].all()
@@ -0,0 +1,181 @@
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import extraction_service
+from extract_pdf_data import PageResult
+from extraction_service import ExtractionService, request_extraction
+
+PAGES = list(range(83, 103, 2))
+
+
+class FakeExtractor:
+    """Stand-in for extract_pdf_data that counts its calls."""
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, page_number, pattern):
+        with self.lock:
+            self.calls.append(page_number)
+        time.sleep(0.02)
+        return PageResult(f"Country{page_number}", page_number, 0.5, 1)
+
+
+async def cancel_tasks():
+    """Cancel the other tasks on the running loop and wait for them."""
+    tasks = asyncio.all_tasks() - {asyncio.current_task()}
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Run a service with a fake extractor on a Unix socket."""
+    extract = FakeExtractor()
+    service = ExtractionService(extract, executor=ThreadPoolExecutor(4))
+    socket_path = str(tmp_path / "service.sock")
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(service.serve(socket_path=socket_path), loop)
+    while not os.path.exists(socket_path):
+        time.sleep(0.01)
+
+    yield service, extract, socket_path
+
+    asyncio.run_coroutine_threadsafe(cancel_tasks(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+    service.executor.shutdown()
+
+
+def test_concurrent_requests_share_a_job(server):
+    service, extract, socket_path = server
+
+    with ThreadPoolExecutor(3) as clients:
+        futures = [
+            clients.submit(
+                request_extraction,
+                "legislators",
+                PAGES,
+                socket_path=socket_path,
+                verbose=False,
+            )
+            for _ in range(3)
+        ]
+        frames = [future.result() for future in futures]
+
+    assert sorted(extract.calls) == PAGES
+    for df in frames:
+        assert list(df["page_number"]) == PAGES
+
+    # A repeat is served from the finished job
+    df = request_extraction("legislators", PAGES, socket_path=socket_path)
+    assert len(extract.calls) == len(PAGES)
+    assert list(df["country"]) == [f"Country{page}" for page in PAGES]
+
+
+def post(socket_path, body, length=None):
+    length = len(body) if length is None else length
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(
+            b"POST /extract HTTP/1.1\r\n"
+            + f"Content-Length: {length}\r\n\r\n".encode()
+            + body
+        )
+        response = sock.makefile("rb").read().decode()
+    head, _, body = response.partition("\r\n\r\n")
+    return head.splitlines()[0], body
+
+
+@pytest.mark.parametrize(
+    "body",
+    [b"{}", b"not json", b"[1, 2]", b'{"pattern": "x", "pages": "83"}'],
+)
+def test_bad_request(server, body):
+    service, extract, socket_path = server
+    status, body = post(socket_path, body)
+    assert status == "HTTP/1.1 400 Bad Request"
+    assert "error" in json.loads(body)
+    assert not extract.calls
+
+
+def test_bad_request_raises(server):
+    _, _, socket_path = server
+    with pytest.raises(RuntimeError, match="400"):
+        request_extraction("", [83], socket_path=socket_path)
+
+
+def test_tasks_are_kept_until_done():
+    async def run():
+        service = ExtractionService(FakeExtractor(), executor=ThreadPoolExecutor(2))
+        job = service.submit("legislators", [83, 85])
+        assert service.submit("legislators", [83, 85]) is job
+        assert len(service.tasks) == 1
+
+        async for event in job.stream():
+            pass
+        await asyncio.sleep(0)
+        assert not service.tasks
+        assert [data["page_number"] for data in event["results"]] == [83, 85]
+
+    asyncio.run(run())
+
+
+def test_default_pages(server, monkeypatch):
+    _, extract, socket_path = server
+    monkeypatch.setattr(extraction_service, "REPORT_PAGES", range(83, 89, 2))
+
+    df = request_extraction("legislators", socket_path=socket_path, verbose=False)
+    assert list(df["page_number"]) == [83, 85, 87]
+    assert sorted(extract.calls) == [83, 85, 87]
+
+
+def test_bad_content_length(server):
+    _, extract, socket_path = server
+    status, body = post(socket_path, b"{}", length="abc")
+    assert status == "HTTP/1.1 400 Bad Request"
+    assert "Content-Length" in json.loads(body)["error"]
+
+
+def test_page_order_shares_a_job():
+    async def run():
+        service = ExtractionService(FakeExtractor(), executor=ThreadPoolExecutor(2))
+        job = service.submit("legislators", [85, 83])
+        assert service.submit("legislators", [83, 85, 83]) is job
+        assert job.pages == [83, 85]
+        async for event in job.stream():
+            pass
+
+    asyncio.run(run())
+
+
+def test_failed_job_cancels_remaining_pages():
+    extract = FakeExtractor()
+
+    def failing(page_number, pattern):
+        extract(page_number, pattern)
+        raise RuntimeError(f"page {page_number}")
+
+    async def run():
+        service = ExtractionService(failing, executor=ThreadPoolExecutor(1))
+        job = service.submit("legislators", PAGES)
+        async for event in job.stream():
+            pass
+        assert "error" in event
+        assert not service.jobs
+
+    asyncio.run(run())
+    assert len(extract.calls) < len(PAGES)
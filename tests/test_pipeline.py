@@ -0,0 +1,81 @@
+import sys
+
+import pipeline
+from pipeline import Stage, run_pipeline
+
+
+def write_stage(path):
+    from helper_module import VALUE
+
+    with open(path, "w") as fp:
+        fp.write(VALUE)
+
+
+def test_code_dependency_reruns_stage(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    helper = tmp_path / "helper_module.py"
+    helper.write_text("VALUE = 'first'\n")
+
+    output = str(tmp_path / "out.txt")
+    stage = Stage(
+        "write",
+        write_stage,
+        dict(path=output),
+        outputs=[output],
+        code_deps=["helper_module"],
+    )
+    stages = {stage.name: stage}
+
+    assert run_pipeline(stages, max_workers=1) == {"write": "ran"}
+    assert run_pipeline(stages, max_workers=1) == {"write": "cached"}
+
+    helper.write_text("VALUE = 'second'\n")
+    sys.modules.pop("helper_module", None)
+    assert run_pipeline(stages, max_workers=1) == {"write": "ran"}
+    assert open(output).read() == "second"
+
+
+def test_stage_key_includes_code_deps(monkeypatch):
+    stage = Stage("score", pipeline.score_stage, code_deps=["utils"])
+    key = pipeline.stage_key(stage, [])
+    monkeypatch.setattr(pipeline, "module_hash", lambda name: "changed")
+    assert pipeline.stage_key(stage, []) != key
+
+
+def write_pages(prefix, n_pages):
+    for i in range(n_pages):
+        with open(f"{prefix}_p{i + 1:02d}.png", "w") as fp:
+            fp.write(str(i))
+
+
+def test_deleted_pattern_output_reruns_stage(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    prefix = str(tmp_path / "chart")
+    stage = Stage(
+        "pages",
+        write_pages,
+        dict(prefix=prefix, n_pages=3),
+        output_patterns=[f"{prefix}_p[0-9][0-9].png"],
+    )
+    stages = {stage.name: stage}
+
+    assert run_pipeline(stages, max_workers=1) == {"pages": "ran"}
+    assert run_pipeline(stages, max_workers=1) == {"pages": "cached"}
+
+    (tmp_path / "chart_p02.png").unlink()
+    assert run_pipeline(stages, max_workers=1) == {"pages": "ran"}
+    assert (tmp_path / "chart_p02.png").exists()
+
+
+def test_figure_and_table_stages_match_the_notebooks():
+    stages = pipeline.build_stages(["earned_income", "primary_education"])
+
+    figures = stages["earned_income.figures"]
+    prefix = figures.params["prefix"]
+    assert figures.outputs == [f"{prefix}.png", f"{prefix}_thumb.png"]
+    assert figures.output_patterns == [f"{prefix}_p[0-9][0-9].png"]
+
+    # The labels each notebook passes to make_weight_table
+    assert stages["earned_income.table"].params["label"] == "professional"
+    assert stages["primary_education.table"].params["label"] == "primary"
@@ -0,0 +1,80 @@
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import estimate_quantiles, weighted_quantiles
+
+QUANTILES = [0.1, 0.25, 0.5, 0.9]
+AGE_MAP = {1: "young", 2: "old"}
+GENDER_MAP = {1: "Male", 2: "Female"}
+
+
+def naive_quantiles(values, weights, quantiles, confidence_level=0.95):
+    """Weighted quantiles of one group by sorting and summing the weights."""
+    order = np.argsort(values)
+    values, weights = values[order], weights[order]
+    cdf = np.cumsum(weights) / weights.sum()
+    n_eff = weights.sum() ** 2 / (weights**2).sum()
+    z = NormalDist().inv_cdf(1 - (1 - confidence_level) / 2)
+
+    def first_reaching(q):
+        return values[min(np.sum(cdf < min(max(q, 0), 1)), len(values) - 1)]
+
+    rows = []
+    for q in quantiles:
+        margin = z * np.sqrt(q * (1 - q) / n_eff)
+        rows.append(
+            [first_reaching(q), first_reaching(q - margin), first_reaching(q + margin)]
+        )
+    return np.array(rows)
+
+
+@pytest.fixture
+def survey():
+    rng = np.random.default_rng(11)
+    n = 200
+    df = pd.DataFrame(
+        dict(
+            income=rng.lognormal(3, 1, n),
+            hours=rng.normal(40, 8, n),
+            age=rng.choice([1, 2, 9], n, p=[0.45, 0.45, 0.1]),
+            gender=rng.choice(list(GENDER_MAP), n),
+            weight=rng.lognormal(0, 0.5, n),
+        )
+    )
+    df.loc[::7, "hours"] = np.nan
+    return df
+
+
+def test_weighted_quantiles_match_naive(survey):
+    values = survey["income"].to_numpy()
+    weights = survey["weight"].to_numpy()
+    groups = survey["gender"].to_numpy() - 1
+
+    estimate, lower, upper = weighted_quantiles(values, weights, groups, QUANTILES)
+    for g in range(2):
+        mask = groups == g
+        expected = naive_quantiles(values[mask], weights[mask], QUANTILES)
+        np.testing.assert_array_equal(estimate[g], expected[:, 0])
+        np.testing.assert_array_equal(lower[g], expected[:, 1])
+        np.testing.assert_array_equal(upper[g], expected[:, 2])
+    assert (lower <= estimate).all() and (estimate <= upper).all()
+
+
+def test_estimate_quantiles_by_age_and_gender(survey):
+    result = estimate_quantiles(
+        survey, ["income", "hours"], QUANTILES, AGE_MAP, GENDER_MAP
+    )
+    assert len(result) == 2 * len(AGE_MAP) * len(GENDER_MAP) * len(QUANTILES)
+
+    for (col, age, gender), rows in result.groupby(["column", "age", "gender"]):
+        group = survey[(survey["age"] == age) & (survey["gender"] == gender)]
+        group = group.dropna(subset=[col])
+        expected = naive_quantiles(
+            group[col].to_numpy(), group["weight"].to_numpy(), QUANTILES
+        )
+        np.testing.assert_array_equal(rows["quantile"], QUANTILES)
+        np.testing.assert_array_equal(rows[["estimate", "lower", "upper"]], expected)
+        assert (rows["age_label"] == AGE_MAP[age]).all()
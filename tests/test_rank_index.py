@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from utils import RankIndex
+
+
+def reference_ranks(scores):
+    """Ranks as make_rank_table computes them on the full frame."""
+    return scores.rank(method="min", ascending=False)
+
+
+def check(index, scores):
+    ranks = reference_ranks(scores)
+    assert len(index) == len(scores)
+    for code in scores.index:
+        assert index.rank(code) == ranks[code]
+    pd.testing.assert_series_equal(
+        index.ranks().sort_index(), ranks.sort_index(), check_names=False
+    )
+
+
+def test_random_changes_match_full_rank():
+    rng = np.random.default_rng(3)
+    codes = [f"C{i:02d}" for i in range(30)]
+    # Few distinct scores, so ties are common
+    values = np.round(rng.uniform(0.6, 0.9, size=len(codes)), 2)
+    scores = pd.Series(values, index=codes)
+    scores.iloc[:2] = np.nan
+    index = RankIndex(scores)
+    scores = scores.dropna()
+    check(index, scores)
+
+    for _ in range(500):
+        action = rng.choice(["insert", "update", "remove"])
+        if action == "remove" and len(scores) > 1:
+            code = rng.choice(scores.index)
+            index._remove(code)
+            scores = scores.drop(code)
+        else:
+            if action == "insert" or len(scores) == 0:
+                code = f"N{rng.integers(1000):03d}"
+            else:
+                code = rng.choice(scores.index)
+            score = round(rng.uniform(0.6, 0.9), 2)
+            before = reference_ranks(scores)
+            rank, moved = index.update(code, score)
+            scores[code] = score
+            after = reference_ranks(scores)
+
+            assert rank == after[code]
+            common = before.index.drop(code, errors="ignore")
+            changed = common[before[common] != after[common]]
+            assert sorted(moved) == sorted(changed)
+        check(index, scores)
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import WEF_INDICATORS, add_revised_scores
+from utils.rank_uncertainty import simulate_ranks
+
+
+def make_frame():
+    return pd.DataFrame(
+        dict(
+            country=["A", "B", "C", "D"],
+            score=[0.60, 0.90, 0.75, 0.50],
+            left=[30.0, 45.0, 22.0, 50.0],
+            right=[60.0, 50.0, 40.0, 45.0],
+        )
+    )
+
+
+@pytest.mark.parametrize("revised", ["ratio", "score"])
+def test_point_ranks_match_add_revised_scores(revised):
+    df = add_revised_scores(make_frame(), revised)
+    expected = df["revised_score"].rank(method="min", ascending=False)
+
+    table = simulate_ranks(
+        df, revised=revised, left_se=0, right_se=0, score_se=0, n_draws=10
+    )
+    pd.testing.assert_series_equal(
+        table["revised_rank"].sort_index(), expected, check_names=False
+    )
+    # Without measurement error, every draw gives the point ranks
+    np.testing.assert_array_equal(table["rank_lower"], table["revised_rank"])
+    np.testing.assert_array_equal(table["rank_upper"], table["revised_rank"])
+
+
+def test_score_indicator_ignores_left_and_right():
+    df = make_frame()
+    df[["left", "right"]] = np.nan
+    revised = WEF_INDICATORS["wage_equality"]["revised"]
+
+    table = simulate_ranks(df, revised=revised, n_draws=100, seed=1)
+    assert list(table["country"]) == ["B", "C", "A", "D"]
+
+
+@pytest.mark.parametrize("right_se", [None, 0.5])
+def test_refuses_denominator_near_zero(right_se):
+    df = make_frame()
+    df.loc[2, "right"] = 0.0 if right_se is None else 1.0
+    with pytest.raises(ValueError, match="C"):
+        simulate_ranks(df, right_se=right_se, n_draws=10)
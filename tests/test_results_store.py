@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import extract_pdf_data
+import results_store
+from extract_pdf_data import PageResult, read_pdfs
+from results_store import ResultsBuffer, read_pdfs_parallel
+
+# An unresolvable name checks that read_pdfs_parallel keeps the raw name
+COUNTRIES = {83: "Iceland", 85: "Viet Nam", 117: "Atlantis"}
+PAGES = list(COUNTRIES)
+
+INDICATOR_LINE = (
+    "Legislators, senior officials and managers% 106th 0.349 -48.24 25.88 74.12 0-100"
+)
+
+
+def page_text(page_number):
+    lines = [f"header {i}" for i in range(13)]
+    lines.append(f"{COUNTRIES[page_number]} 43rd 0.747")
+    lines += ["Economic participation filler", "Global Gender Gap Index indicators"]
+    lines.append(INDICATOR_LINE)
+    return "\n".join(lines)
+
+
+@pytest.fixture
+def fake_pages(monkeypatch):
+    # Workers are forked, so they inherit the patched reader
+    def read_page_text(page_number, backend=None):
+        return page_text(page_number)
+
+    monkeypatch.setattr(extract_pdf_data, "REPORT_PAGES", PAGES)
+    monkeypatch.setattr(extract_pdf_data, "read_page_text", read_page_text)
+
+
+def test_matches_read_pdfs(fake_pages):
+    expected = read_pdfs("legislators")
+    result = read_pdfs_parallel("legislators", PAGES, max_workers=2)
+
+    assert list(result["code"].astype(object)) == ["ISL", "VNM", np.nan]
+    pd.testing.assert_frame_equal(result.drop(columns="code"), expected)
+
+
+def test_frame_is_a_view():
+    with ResultsBuffer(2) as buffer:
+        buffer.write(0, PageResult("Iceland", 83, 0.9, 1, 1.0, 50.0, 49.0))
+        buffer.write(1, PageResult(None, 85))
+        df = buffer.frame()
+
+        assert np.shares_memory(df["score"].to_numpy(), buffer.floats)
+        assert list(df["country"]) == ["Iceland", None]
+        assert list(df["code"].astype(object)) == ["ISL", np.nan]
+        assert df["rank"].dtype == "Int64"
+        assert df["rank"].isna().tolist() == [False, True]
+
+    # The mapping outlives the file
+    assert df.loc[0, "score"] == 0.9
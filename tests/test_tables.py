@@ -0,0 +1,47 @@
+import os
+
+import pandas as pd
+
+from utils import write_tables
+
+# LaTeX needs jinja2, which the repo doesn't declare
+FORMATS = ("csv", "html", "parquet")
+
+# A time well before any file written by the test
+OLD = 1_000_000_000 * 10**9
+
+
+def mtimes(directory):
+    return {
+        name: os.stat(os.path.join(directory, name)).st_mtime_ns
+        for name in os.listdir(directory)
+    }
+
+
+def test_write_tables_skips_unchanged_files(tmp_path):
+    directory = str(tmp_path / "tables")
+    tables = dict(
+        ranks=pd.DataFrame(dict(country=["Iceland", "Norway"], rank=[1, 2])),
+        scores=pd.DataFrame(dict(score=[0.912, 0.879])),
+    )
+    written = write_tables(tables, FORMATS, directory)
+    assert len(written) == 6
+    assert all(written.values())
+
+    # Backdate the files, so a rewrite would show even on coarse clocks
+    for name in os.listdir(directory):
+        os.utime(os.path.join(directory, name), ns=(OLD, OLD))
+
+    written = write_tables(tables, FORMATS, directory)
+    assert not any(written.values())
+    assert set(mtimes(directory).values()) == {OLD}
+
+    tables["scores"] = pd.DataFrame(dict(score=[0.912, 0.880]))
+    written = write_tables(tables, FORMATS, directory)
+    changed = {os.path.basename(name) for name, flag in written.items() if flag}
+    assert changed == {"scores.csv", "scores.html", "scores.parquet"}
+    for name, mtime in mtimes(directory).items():
+        assert (mtime != OLD) == (name in changed)
+    pd.testing.assert_frame_equal(
+        pd.read_parquet(os.path.join(directory, "scores.parquet")), tables["scores"]
+    )
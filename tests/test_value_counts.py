@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import value_count_frame, value_counts
+
+
+def reference_value_count_frame(data, columns, normalize=False, weights=None):
+    """value_count_frame as it was, with weights summed per column."""
+    dfs = []
+    for col in columns:
+        if weights is None:
+            df = value_counts(data[col], normalize=normalize)
+        else:
+            sums = data[weights].groupby(data[col], dropna=False, observed=False)
+            sums = sums.sum()
+            if normalize:
+                sums = sums / sums.sum()
+            sums.index.name = "values"
+            df = pd.DataFrame(sums)
+        df.columns = [col]
+        dfs.append(df)
+    return pd.concat(dfs, axis=1)
+
+
+@pytest.fixture
+def survey():
+    rng = np.random.default_rng(7)
+    n = 300
+    df = pd.DataFrame(
+        dict(
+            q1=rng.integers(1, 6, n),
+            q2=rng.integers(3, 8, n),
+            q3=rng.choice([1.0, 2.0, np.nan], n),
+            flag=rng.random(n) < 0.3,
+            other=rng.random(n) < 0.6,
+            weight=rng.lognormal(0, 0.5, n),
+        )
+    )
+    labels = ["low", "mid", "high"]
+    df["level"] = pd.Categorical(rng.choice(labels, n), categories=labels)
+    df["level2"] = pd.Categorical(rng.choice(labels[:2], n), categories=labels)
+    df["nullable"] = pd.array(rng.choice([1, 2, 4], n), dtype="Int64")
+    df.loc[::9, "nullable"] = pd.NA
+    return df
+
+
+CASES = [
+    ["q1"],
+    ["q1", "q2"],
+    ["q2", "q1", "q3"],
+    ["flag", "other"],
+    ["level", "level2"],
+    ["nullable"],
+    ["nullable", "q1"],
+]
+
+
+@pytest.mark.parametrize("columns", CASES)
+@pytest.mark.parametrize("normalize", [False, True])
+def test_matches_reference(survey, columns, normalize):
+    expected = reference_value_count_frame(survey, columns, normalize)
+    result = value_count_frame(survey, columns, normalize)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+@pytest.mark.parametrize("columns", CASES)
+def test_weighted_matches_reference(survey, columns):
+    expected = reference_value_count_frame(survey, columns, weights="weight")
+    result = value_count_frame(survey, columns, weights="weight")
+    pd.testing.assert_frame_equal(result, expected)
+
+    result = value_count_frame(survey, columns, weights=survey["weight"])
+    pd.testing.assert_frame_equal(result, expected)
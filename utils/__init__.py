@@ -0,0 +1,1516 @@
+"""Utility functions for data analysis and visualization.
+
+The plotting functions live in utils.plotting, which imports matplotlib.
+They are still available as attributes of utils, but the submodule is only
+imported the first time one of them is used, so scripts that only need the
+data and statistics functions start quickly.
+"""
+
+import bisect
+import difflib
+import hashlib
+import io
+import os
+import re
+import unicodedata
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+# =============================================================================
+# File I/O Functions
+# =============================================================================
+
+
+TABLE_FORMATS = ("tex", "csv", "html", "parquet")
+
+
+def _render_table(table, fmt, index=True):
+    """Render a table in one format.
+
+    Args:
+        table: DataFrame
+        fmt: key in TABLE_FORMATS
+        index: whether to include the index
+
+    Returns:
+        bytes
+    """
+    if fmt == "tex":
+        return table.to_latex(index=index).encode("utf8")
+    if fmt == "csv":
+        return table.to_csv(index=index).encode("utf8")
+    if fmt == "html":
+        return table.to_html(index=index).encode("utf8")
+    if fmt == "parquet":
+        buffer = io.BytesIO()
+        table.to_parquet(buffer, index=index)
+        return buffer.getvalue()
+    raise ValueError(f"Unknown table format: {fmt}")
+
+
+def _write_if_changed(filename, data):
+    """Write bytes to a file unless it already holds the same content.
+
+    Args:
+        filename: string
+        data: bytes
+
+    Returns:
+        True if the file was written
+    """
+    digest = hashlib.sha256(data).digest()
+    if os.path.exists(filename):
+        with open(filename, "rb") as fp:
+            if hashlib.sha256(fp.read()).digest() == digest:
+                return False
+    with open(filename, "wb") as fp:
+        fp.write(data)
+    return True
+
+
+def write_table(table, label, **options):
+    """Write a table in LaTex format.
+
+    The file is left alone if its content wouldn't change.
+
+    Args:
+        table: DataFrame
+        label: string
+        options: passed to DataFrame.to_latex
+    """
+    filename = f"tables/{label}.tex"
+    os.makedirs("tables", exist_ok=True)
+    s = table.to_latex(**options)
+    _write_if_changed(filename, s.encode("utf8"))
+
+
+def write_tables(
+    tables, formats=TABLE_FORMATS, directory="tables", index=True, max_workers=None
+):
+    """Write many tables in several formats, in parallel.
+
+    Each table is rendered in memory and written only if the file's
+    content would change, so republishing touches only changed tables.
+
+    Args:
+        tables: dictionary mapping labels to DataFrames
+        formats: sequence of keys in TABLE_FORMATS
+        directory: output directory
+        index: whether to include the index
+        max_workers: number of threads
+
+    Returns:
+        dictionary mapping filenames to True if written, False if unchanged
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    def export(label, fmt):
+        filename = os.path.join(directory, f"{label}.{fmt}")
+        data = _render_table(tables[label], fmt, index)
+        return filename, _write_if_changed(filename, data)
+
+    jobs = [(label, fmt) for label in tables for fmt in formats]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(executor.map(lambda job: export(*job), jobs))
+
+
+def write_pmf(pmf, label):
+    """Write a Pmf object as a table.
+
+    Args:
+        pmf: Pmf
+        label: string
+    """
+    df = pd.DataFrame()
+    df["qs"] = pmf.index
+    df["ps"] = pmf.values
+    write_table(df, label, index=False)
+
+
+# =============================================================================
+# Data Manipulation Functions
+# =============================================================================
+
+
+def underride(d, **options):
+    """Add key-value pairs to d only if key is not in d.
+
+    Args:
+        d: dictionary
+        options: keyword args to add to d
+
+    Returns:
+        Updated dictionary
+    """
+    for key, val in options.items():
+        d.setdefault(key, val)
+    return d
+
+
+def value_counts(seq, **options):
+    """Make a series of values and the number of times they appear.
+
+    Returns a DataFrame because they get rendered better in Jupyter.
+
+    Args:
+        seq: sequence
+        options: passed to pd.Series.value_counts
+
+    Returns:
+        pd.DataFrame with value counts
+    """
+    options = underride(options, dropna=False)
+    series = pd.Series(seq).value_counts(**options).sort_index()
+    series.index.name = "values"
+    series.name = "counts"
+    return pd.DataFrame(series)
+
+
+def _integer_crosstab(values, weights=None, max_range=1 << 16):
+    """Count small-integer codes, column by column, without hashing.
+
+    Each value's cell is its offset from the smallest value, with NaN in an
+    extra cell at the end, so the counts for a column are one bincount.
+
+    Args:
+        values: float array (rows x columns)
+        weights: float array of row weights, or None
+        max_range: largest span of values to count this way
+
+    Returns:
+        tuple like crosstab_counts, or None if the values aren't small integers
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        low, high = np.nanmin(values), np.nanmax(values)
+    if not np.isfinite(low) or not np.isfinite(high) or high - low >= max_range:
+        return None
+
+    n_cells = int(high - low) + 2
+    counts = np.zeros((n_cells, values.shape[1]), dtype=np.int64)
+    weighted = None if weights is None else np.zeros(counts.shape)
+
+    for j in range(values.shape[1]):
+        offsets = values[:, j] - low
+        offsets[np.isnan(offsets)] = n_cells - 1
+        if not np.array_equal(offsets, np.floor(offsets)):
+            return None
+        cells = offsets.astype(np.intp)
+        counts[:, j] = np.bincount(cells, minlength=n_cells)
+        if weights is not None:
+            weighted[:, j] = np.bincount(cells, weights=weights, minlength=n_cells)
+
+    seen = counts.sum(axis=1) > 0
+    uniques = np.append(np.arange(low, high + 1), np.nan)[seen]
+    weighted = None if weighted is None else weighted[seen]
+    return pd.Index(uniques), counts[seen], weighted
+
+
+def crosstab_counts(data, columns, weights=None):
+    """Count the values in several columns in one pass.
+
+    The columns share one set of values, so each (value, column) count is a
+    cell of one array; nothing is sorted per column or concatenated.
+    Numeric columns holding small integers, like survey item codes, are
+    counted arithmetically; other values are factorized once, stacked.
+
+    Args:
+        data: DataFrame
+        columns: list of column names
+        weights: name of a weight column, or a Series aligned with data
+
+    Returns:
+        tuple of (sorted Index of values, counts array (values x columns),
+        weighted counts array or None)
+    """
+    if isinstance(weights, str):
+        weights = data[weights]
+    if weights is not None:
+        weights = np.asarray(weights, dtype=float)
+
+    values = data[columns].to_numpy()
+    if values.dtype.kind in "iufb" and values.size:
+        result = _integer_crosstab(values.astype(float), weights)
+        if result is not None:
+            uniques, counts, weighted = result
+            if values.dtype.kind in "iu":
+                uniques = uniques.astype(values.dtype)
+            return uniques, counts, weighted
+
+    n_rows, n_cols = values.shape
+    codes, uniques = pd.factorize(values.ravel(order="F"), use_na_sentinel=False)
+    try:
+        uniques, order = pd.Index(uniques).sort_values(
+            return_indexer=True, na_position="last"
+        )
+    except TypeError:
+        # Values that can't be compared, like numbers and strings, stay unsorted
+        uniques, order = pd.Index(uniques), np.arange(len(uniques))
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+
+    # One cell per (column, value) pair
+    n_values = len(uniques)
+    cells = rank[codes] + np.repeat(np.arange(n_cols) * n_values, n_rows)
+    size = n_cols * n_values
+    counts = np.bincount(cells, minlength=size).reshape(n_cols, n_values).T
+
+    weighted = None
+    if weights is not None:
+        tiled = np.tile(weights, n_cols)
+        weighted = np.bincount(cells, weights=tiled, minlength=size)
+        weighted = weighted.reshape(n_cols, n_values).T
+
+    return uniques, counts, weighted
+
+
+def _value_count_column(series, normalize=False, weights=None):
+    """Count the values in one column, like value_counts, with optional weights."""
+    if weights is None:
+        return value_counts(series, normalize=normalize)
+    sums = weights.groupby(series, dropna=False, observed=False).sum()
+    if normalize:
+        sums = sums / sums.sum()
+    sums.index.name = "values"
+    sums.name = "counts"
+    return pd.DataFrame(sums)
+
+
+def value_count_frame(data, columns, normalize=False, weights=None):
+    """Make a DataFrame of value counts.
+
+    Columns with a plain numeric dtype are counted together with
+    crosstab_counts.  Other columns, like bool, categorical and nullable
+    integer columns, are counted one at a time, so their index keeps its
+    dtype.  Either way, the index is in the order pd.concat makes from the
+    sorted counts of each column.
+
+    Args:
+        data: DataFrame
+        columns: list of column names
+        normalize: whether to normalize the counts
+        weights: name of a weight column, or a Series aligned with data;
+            if provided, the counts are sums of weights
+
+    Returns:
+        DataFrame with value counts
+    """
+    if isinstance(weights, str):
+        weights = data[weights]
+
+    dtypes = [data[col].dtype for col in columns]
+    if not all(
+        isinstance(dtype, np.dtype) and dtype.kind in "iuf" for dtype in dtypes
+    ):
+        dfs = []
+        for col in columns:
+            df = _value_count_column(data[col], normalize, weights)
+            df.columns = [col]
+            dfs.append(df)
+        return pd.concat(dfs, axis=1)
+
+    uniques, counts, weighted = crosstab_counts(data, columns, weights)
+    values = counts if weighted is None else weighted
+    if normalize:
+        values = values / values.sum(axis=0)
+
+    index = pd.Index(uniques, name="values")
+    df = pd.DataFrame(values, index=index, columns=columns)
+
+    # Like value_counts, values that don't appear in a column are missing
+    df = df.where(counts > 0)
+
+    # Like pd.concat, each column adds the values it has that earlier
+    # columns don't, in sorted order
+    present = counts > 0
+    seen = np.zeros(len(index), dtype=bool)
+    order = []
+    for j in range(present.shape[1]):
+        new = present[:, j] & ~seen
+        order.extend(np.flatnonzero(new))
+        seen |= new
+    return df.iloc[order]
+
+
+def select_columns(names, prefix):
+    """Select names that start with a prefix, leaving out skips and timings.
+
+    Args:
+        names: sequence of column names
+        prefix: string prefix, or tuple of prefixes
+
+    Returns:
+        list of column names
+    """
+    return [
+        col
+        for col in names
+        if col.startswith(prefix)
+        and not col.endswith("skp")
+        and not col.endswith("timing")
+    ]
+
+
+def find_columns(df, prefix):
+    """Find columns that start with a given prefix.
+
+    Args:
+        df: DataFrame
+        prefix: string prefix
+
+    Returns:
+        list of column names
+    """
+    return select_columns(df.columns, prefix)
+
+
+def bin_codes(series, bin_width, low=0, high=None):
+    """Find the fixed-width bin each value belongs in.
+
+    The bin edges are np.arange(low, high + bin_width, bin_width), as in
+    round_into_bins.  Codes come from dividing by the width, and any code
+    that rounding put one bin off is corrected by comparing the value with
+    its bin's edges, so decimal widths give the same bins as np.digitize.
+    Values below low go in the first bin and values past the last edge in
+    the last.  The bins depend only on the arguments, so chunks of a stream
+    binned with the same low, high and bin_width get the same categories.
+
+    Args:
+        series: pd.Series
+        bin_width: number, width of the bins
+        low: lower edge of the first bin
+        high: value in the last bin; by default, series.max()
+
+    Returns:
+        Categorical Series whose categories are the lower edges of the bins,
+        with code -1 for NaN
+    """
+    if high is None:
+        high = series.max()
+    edges = np.arange(low, high + bin_width, bin_width)
+    n_bins = len(edges)
+
+    values = np.asarray(series, dtype=float)
+    scaled = (values - low) / bin_width
+    np.clip(scaled, -1, n_bins, out=scaled)
+    missing = np.isnan(scaled)
+    scaled[missing] = 0
+    # Truncating matches floor here, since codes below 0 are clipped anyway
+    codes = scaled.astype(np.int32)
+    np.clip(codes, 0, n_bins - 1, out=codes)
+
+    # Move values that rounding put one bin too high or too low
+    codes -= values < edges[codes]
+    np.clip(codes, 0, n_bins - 1, out=codes)
+    upper = np.minimum(codes + 1, n_bins - 1)
+    codes += (upper > codes) & (values >= edges[upper])
+    codes[missing] = -1
+
+    categorical = pd.Categorical.from_codes(codes, categories=edges)
+    return pd.Series(categorical, index=series.index, name=series.name)
+
+
+def round_into_bins(series, bin_width, low=0, high=None):
+    """Rounds values down to the bin they belong in.
+
+    series: pd.Series
+    bin_width: number, width of the bins
+
+    returns: Series of bin values (with NaN preserved)
+    """
+    binned = bin_codes(series, bin_width, low, high)
+    edges = np.append(binned.cat.categories.to_numpy(float), np.nan)
+    # Code -1 picks the NaN at the end
+    return pd.Series(edges[binned.cat.codes], index=series.index, dtype="float")
+
+
+# =============================================================================
+# Categorical Data Functions
+# =============================================================================
+
+
+def extract_categorical_mapping(series):
+    """Extract a mapping from categorical codes to descriptions.
+
+    Args:
+        series: pandas Series
+
+    Returns:
+        pd.Series mapping from codes to descriptions
+    """
+    mapping = {}
+
+    for item in series.unique():  # Process unique categorical values
+        match = re.match(r"([-\d]+)\.\s(.+)", str(item).strip())
+        if match:
+            code, description = match.groups()
+            mapping[int(code)] = description
+
+    return pd.Series(mapping).sort_index()
+
+
+def make_categorical_mappings(df, skip_cols=["age"]):
+    """Make a mapping from variable names to dictionaries of codes and values.
+
+    Args:
+        df: DataFrame
+        skip_cols: list of string column names to skip
+
+    Returns:
+        dictionary that maps from column names to dictionaries
+    """
+    mappings = {}
+    for col in df.columns:
+        if col in skip_cols:
+            continue
+        mapping = extract_categorical_mapping(df[col])
+        if len(mapping) > 0:
+            mappings[col] = mapping
+    return mappings
+
+
+def map_codes_to_categories(cat_series: pd.Series, code_series: pd.Series) -> pd.Series:
+    """Map numeric codes to category labels.
+
+    Args:
+        cat_series: Series containing category labels
+        code_series: Series containing numeric codes
+
+    Returns:
+        Series with mapped category labels
+    """
+    # Extract the mapping
+    mapping = extract_categorical_mapping(cat_series)
+
+    # Map the codes to categories
+    return code_series.map(mapping)
+
+
+# =============================================================================
+# Statistical Functions
+# =============================================================================
+
+
+def estimate_proportion_jeffreys(success_series, confidence_level=0.95):
+    """Estimate proportion using Jeffreys prior.
+
+    Args:
+        success_series: Boolean series (True = success)
+        confidence_level: Confidence level (e.g., 0.95)
+
+    Returns:
+        tuple: (proportion, lower_bound, upper_bound)
+    """
+    from scipy import stats
+
+    success_series = success_series.astype(float)
+    n = len(success_series)
+    k = success_series.sum()
+
+    # Jeffreys prior: Beta(0.5, 0.5)
+    alpha = k + 0.5
+    beta = n - k + 0.5
+
+    # Calculate posterior mean
+    proportion = alpha / (alpha + beta)
+
+    # Calculate credible interval
+    lower = stats.beta.ppf((1 - confidence_level) / 2, alpha, beta)
+    upper = stats.beta.ppf(1 - (1 - confidence_level) / 2, alpha, beta)
+
+    return proportion, lower, upper
+
+
+def estimate_proportion_wilson(success_series, weights_series, confidence_level=0.95):
+    """Estimate weighted proportion with Wilson score interval adjusted using effective sample size.
+
+    Args:
+        success_series: Boolean series (True = success)
+        weights_series: Corresponding weights
+        confidence_level: Confidence level (e.g., 0.95)
+
+    Returns:
+        tuple: (weighted_proportion, lower_bound, upper_bound)
+    """
+    success_series = success_series.astype(float)
+    weights_series = weights_series.astype(float)
+
+    weighted_successes = (success_series * weights_series).sum()
+    total_weight = weights_series.sum()
+
+    p = weighted_successes / total_weight
+
+    # Estimate effective sample size
+    n_eff = total_weight**2 / (weights_series**2).sum()
+
+    # Z-score for confidence interval
+    z = NormalDist().inv_cdf(1 - (1 - confidence_level) / 2)
+
+    denominator = 1 + z**2 / n_eff
+    center = (p + z**2 / (2 * n_eff)) / denominator
+    margin = (z * np.sqrt((p * (1 - p) + z**2 / (4 * n_eff)) / n_eff)) / denominator
+
+    lower = center - margin
+    upper = center + margin
+
+    return p, lower, upper
+
+
+def estimate_columns(df, columns, values):
+    """Estimate proportions for multiple columns.
+
+    Args:
+        df: DataFrame
+        columns: list of column names
+        values: list of values to estimate
+
+    Returns:
+        DataFrame with estimates
+    """
+    estimates = []
+    for col in columns:
+        for value in values:
+            success = df[col] == value
+            p, lower, upper = estimate_proportion_wilson(success, df["weight"])
+            estimates.append(
+                {
+                    "column": col,
+                    "value": value,
+                    "proportion": p,
+                    "lower": lower,
+                    "upper": upper,
+                }
+            )
+    return pd.DataFrame(estimates)
+
+
+def estimate_value_map(df, columns, value_map):
+    """Estimate proportions using a value mapping.
+
+    Args:
+        df: DataFrame
+        columns: list of column names
+        value_map: dictionary mapping values to labels
+
+    Returns:
+        DataFrame with estimates
+    """
+    estimates = []
+    for col in columns:
+        for value, label in value_map.items():
+            success = df[col] == value
+            p, lower, upper = estimate_proportion_wilson(success, df["weight"])
+            estimates.append(
+                {
+                    "column": col,
+                    "value": value,
+                    "label": label,
+                    "proportion": p,
+                    "lower": lower,
+                    "upper": upper,
+                }
+            )
+    return pd.DataFrame(estimates)
+
+
+def estimate_gender_map(df, columns, gender_map, value_map):
+    """Estimate proportions by gender.
+
+    Args:
+        df: DataFrame
+        columns: list of column names
+        gender_map: dictionary mapping gender codes to labels
+        value_map: dictionary mapping values to labels
+
+    Returns:
+        DataFrame with estimates
+    """
+    estimates = []
+    for col in columns:
+        for gender, gender_label in gender_map.items():
+            for value, label in value_map.items():
+                success = (df[col] == value) & (df["gender"] == gender)
+                p, lower, upper = estimate_proportion_wilson(success, df["weight"])
+                estimates.append(
+                    {
+                        "column": col,
+                        "gender": gender,
+                        "gender_label": gender_label,
+                        "value": value,
+                        "label": label,
+                        "proportion": p,
+                        "lower": lower,
+                        "upper": upper,
+                    }
+                )
+    return pd.DataFrame(estimates)
+
+
+def estimate_ordinal(df, column, values, cumulative=False, confidence_level=0.95):
+    """Estimate proportions for ordinal data.
+
+    Args:
+        df: DataFrame
+        column: column name
+        values: list of values
+        cumulative: whether to compute cumulative proportions
+        confidence_level: confidence level
+
+    Returns:
+        DataFrame with estimates
+    """
+    estimates = []
+    for value in values:
+        if cumulative:
+            success = df[column] >= value
+        else:
+            success = df[column] == value
+        p, lower, upper = estimate_proportion_wilson(
+            success, df["weight"], confidence_level
+        )
+        estimates.append(
+            {
+                "value": value,
+                "proportion": p,
+                "lower": lower,
+                "upper": upper,
+            }
+        )
+    return pd.DataFrame(estimates)
+
+
+def ordinal_gender_map(
+    df, gender_map, column, values, cumulative=False, confidence_level=0.95
+):
+    """Estimate ordinal proportions by gender.
+
+    Args:
+        df: DataFrame
+        gender_map: dictionary mapping gender codes to labels
+        column: column name
+        values: list of values
+        cumulative: whether to compute cumulative proportions
+        confidence_level: confidence level
+
+    Returns:
+        DataFrame with estimates
+    """
+    estimates = []
+    for gender, gender_label in gender_map.items():
+        for value in values:
+            if cumulative:
+                success = (df[column] >= value) & (df["gender"] == gender)
+            else:
+                success = (df[column] == value) & (df["gender"] == gender)
+            p, lower, upper = estimate_proportion_wilson(
+                success, df["weight"], confidence_level
+            )
+            estimates.append(
+                {
+                    "gender": gender,
+                    "gender_label": gender_label,
+                    "value": value,
+                    "proportion": p,
+                    "lower": lower,
+                    "upper": upper,
+                }
+            )
+    return pd.DataFrame(estimates)
+
+
+def ordinal_age_gender_map(
+    df, age_map, gender_map, column, values, cumulative=False, confidence_level=0.95
+):
+    """Estimate ordinal proportions by age and gender.
+
+    Args:
+        df: DataFrame
+        age_map: dictionary mapping age codes to labels
+        gender_map: dictionary mapping gender codes to labels
+        column: column name
+        values: list of values
+        cumulative: whether to compute cumulative proportions
+        confidence_level: confidence level
+
+    Returns:
+        DataFrame with estimates
+    """
+    estimates = []
+    for age, age_label in age_map.items():
+        for gender, gender_label in gender_map.items():
+            for value in values:
+                if cumulative:
+                    success = (
+                        (df[column] >= value)
+                        & (df["age"] == age)
+                        & (df["gender"] == gender)
+                    )
+                else:
+                    success = (
+                        (df[column] == value)
+                        & (df["age"] == age)
+                        & (df["gender"] == gender)
+                    )
+                p, lower, upper = estimate_proportion_wilson(
+                    success, df["weight"], confidence_level
+                )
+                estimates.append(
+                    {
+                        "age": age,
+                        "age_label": age_label,
+                        "gender": gender,
+                        "gender_label": gender_label,
+                        "value": value,
+                        "proportion": p,
+                        "lower": lower,
+                        "upper": upper,
+                    }
+                )
+    return pd.DataFrame(estimates)
+
+
+def weighted_quantiles(values, weights, groups, quantiles, confidence_level=0.95):
+    """Estimate weighted quantiles for many groups at once.
+
+    The values are sorted once, then stably by group, so the cumulative
+    weights within each group are one cumsum.  Each quantile is the first
+    value where the group's weighted CDF reaches q.  The interval is
+    Woodruff's: the quantiles at q -/+ z * sqrt(q (1 - q) / n_eff), where
+    n_eff is the group's effective sample size, as in
+    estimate_proportion_wilson.
+
+    Args:
+        values: float array without NaNs
+        weights: float array of weights
+        groups: int array of group numbers from 0 to n_groups - 1
+        quantiles: sequence of probabilities
+        confidence_level: confidence level
+
+    Returns:
+        tuple of arrays (groups x quantiles): estimate, lower, upper; NaN for
+        empty groups
+    """
+    n_groups = groups.max(initial=-1) + 1
+    order = np.argsort(values)
+    small = np.int16 if n_groups < 1 << 15 else np.intp
+    order = order[np.argsort(groups[order].astype(small), kind="stable")]
+    values, weights, groups = values[order], weights[order], groups[order]
+
+    sizes = np.bincount(groups, minlength=n_groups)
+    ends = np.cumsum(sizes)
+    starts = ends - sizes
+    totals = np.bincount(groups, weights, minlength=n_groups)
+    squares = np.bincount(groups, weights**2, minlength=n_groups)
+
+    # Group number plus the CDF within the group is non-decreasing overall
+    cumulative = np.cumsum(weights)
+    before = np.concatenate([[0.0], cumulative])[starts]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cdf = (cumulative - before[groups]) / totals[groups]
+        n_eff = totals**2 / squares
+    keys = groups + cdf
+
+    q = np.asarray(quantiles, dtype=float)[None, :]
+    z = NormalDist().inv_cdf(1 - (1 - confidence_level) / 2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        margin = z * np.sqrt(q * (1 - q) / n_eff[:, None])
+
+    def lookup(probs):
+        probs = np.clip(probs, 0, 1)
+        targets = np.arange(n_groups)[:, None] + probs
+        index = np.searchsorted(keys, targets.ravel()).reshape(targets.shape)
+        index = np.clip(index, starts[:, None], ends[:, None] - 1)
+        result = values[np.clip(index, 0, len(values) - 1)]
+        result[sizes == 0] = np.nan
+        return result
+
+    return lookup(q), lookup(q - margin), lookup(q + margin)
+
+
+def estimate_quantiles(
+    df,
+    columns,
+    quantiles=(0.25, 0.5, 0.75),
+    age_map=None,
+    gender_map=None,
+    confidence_level=0.95,
+):
+    """Estimate weighted quantiles of continuous columns by age and gender.
+
+    Rows with an age or gender that isn't in the maps are left out, as are
+    missing values.
+
+    Args:
+        df: DataFrame with a weight column, and age and gender columns if
+            the maps are given
+        columns: list of column names
+        quantiles: sequence of probabilities
+        age_map: dictionary mapping age codes to labels, or None
+        gender_map: dictionary mapping gender codes to labels, or None
+        confidence_level: confidence level
+
+    Returns:
+        DataFrame with estimates
+    """
+    keys = [("age", age_map), ("gender", gender_map)]
+    keys = [(name, mapping) for name, mapping in keys if mapping is not None]
+
+    # One group number per combination of the mapped codes
+    groups = np.zeros(len(df), dtype=np.intp)
+    valid = np.ones(len(df), dtype=bool)
+    for name, mapping in keys:
+        codes = pd.Index(list(mapping)).get_indexer(df[name])
+        valid &= codes >= 0
+        groups = groups * len(mapping) + codes
+
+    # One row per group, with the codes and labels in group-number order
+    n_groups = int(np.prod([len(mapping) for _, mapping in keys]))
+    group_table = pd.DataFrame(index=range(n_groups))
+    if keys:
+        index = pd.MultiIndex.from_product([list(mapping) for _, mapping in keys])
+        for i, (name, mapping) in enumerate(keys):
+            codes = index.get_level_values(i)
+            group_table[name] = codes
+            group_table[f"{name}_label"] = codes.map(mapping)
+    group_table = group_table.loc[group_table.index.repeat(len(quantiles))]
+    group_table = group_table.reset_index(drop=True)
+
+    weights = df["weight"].to_numpy(float)
+
+    frames = []
+    for col in columns:
+        values = df[col].to_numpy(float)
+        keep = valid & ~np.isnan(values)
+        results = weighted_quantiles(
+            values[keep], weights[keep], groups[keep], quantiles, confidence_level
+        )
+
+        # Groups past the last one with data get NaNs
+        estimate, lower, upper = (
+            np.vstack([a, np.full((n_groups - len(a), len(quantiles)), np.nan)])
+            for a in results
+        )
+        frame = group_table.copy()
+        frame.insert(0, "column", col)
+        frame["quantile"] = np.tile(quantiles, n_groups)
+        frame["estimate"] = estimate.ravel()
+        frame["lower"] = lower.ravel()
+        frame["upper"] = upper.ravel()
+        frames.append(frame)
+
+    return pd.concat(frames, ignore_index=True)
+
+
+code_to_wef_country = {
+    "ALB": "Albania",
+    "DZA": "Algeria",
+    "AGO": "Angola",
+    "ARG": "Argentina",
+    "ARM": "Armenia",
+    "AUS": "Australia",
+    "AUT": "Austria",
+    "AZE": "Azerbaijan",
+    "BHR": "Bahrain",
+    "BGD": "Bangladesh",
+    "BRB": "Barbados",
+    "BLR": "Belarus",
+    "BEL": "Belgium",
+    "BLZ": "Belize",
+    "BEN": "Benin",
+    "BTN": "Bhutan",
+    "BOL": "Bolivia",
+    "BIH": "Bosnia-Herzegovina",
+    "BWA": "Botswana",
+    "BRA": "Brazil",
+    "BRN": "Brunei",
+    "BGR": "Bulgaria",
+    "BFA": "Burkina Faso",
+    "BDI": "Burundi",
+    "KHM": "Cambodia",
+    "CMR": "Cameroon",
+    "CAN": "Canada",
+    "CPV": "Cape Verde",
+    "TCD": "Chad",
+    "CHL": "Chile",
+    "CHN": "China",
+    "COL": "Colombia",
+    "COM": "Comoros",
+    "COD": "D.R. Congo",
+    "CRI": "Costa Rica",
+    "CIV": "Côte D'Ivoire",
+    "HRV": "Croatia",
+    "CYP": "Cyprus",
+    "CZE": "Czechia",
+    "DNK": "Denmark",
+    "DOM": "Dominican Republic",
+    "ECU": "Ecuador",
+    "EGY": "Egypt",
+    "SLV": "El Salvador",
+    "EST": "Estonia",
+    "SWZ": "Eswatini",
+    "ETH": "Ethiopia",
+    "FJI": "Fiji",
+    "FIN": "Finland",
+    "FRA": "France",
+    "GMB": "Gambia",
+    "GEO": "Georgia",
+    "DEU": "Germany",
+    "GHA": "Ghana",
+    "GRC": "Greece",
+    "GTM": "Guatemala",
+    "GIN": "Guinea",
+    "GUY": "Guyana",
+    "HND": "Honduras",
+    "HUN": "Hungary",
+    "ISL": "Iceland",
+    "IND": "India",
+    "IDN": "Indonesia",
+    "IRN": "Iran",
+    "IRL": "Ireland",
+    "ISR": "Israel",
+    "ITA": "Italy",
+    "JAM": "Jamaica",
+    "JPN": "Japan",
+    "JOR": "Jordan",
+    "KAZ": "Kazakhstan",
+    "KEN": "Kenya",
+    "KWT": "Kuwait",
+    "KGZ": "Kyrgyzstan",
+    "LAO": "Laos",
+    "LVA": "Latvia",
+    "LBN": "Lebanon",
+    "LSO": "Lesotho",
+    "LBR": "Liberia",
+    "LTU": "Lithuania",
+    "LUX": "Luxembourg",
+    "MDG": "Madagascar",
+    "MYS": "Malaysia",
+    "MDV": "Maldives",
+    "MLI": "Mali",
+    "MLT": "Malta",
+    "MUS": "Mauritius",
+    "MEX": "Mexico",
+    "MDA": "Moldova",
+    "MNG": "Mongolia",
+    "MNE": "Montenegro",
+    "MAR": "Morocco",
+    "MOZ": "Mozambique",
+    "NAM": "Namibia",
+    "NPL": "Nepal",
+    "NLD": "Netherlands",
+    "NZL": "New Zealand",
+    "NIC": "Nicaragua",
+    "NER": "Niger",
+    "NGA": "Nigeria",
+    "MKD": "North Macedonia",
+    "NOR": "Norway",
+    "OMN": "Oman",
+    "PAK": "Pakistan",
+    "PAN": "Panama",
+    "PRY": "Paraguay",
+    "PER": "Peru",
+    "PHL": "Philippines",
+    "POL": "Poland",
+    "PRT": "Portugal",
+    "QAT": "Qatar",
+    "ROU": "Romania",
+    "RWA": "Rwanda",
+    "SAU": "Saudi Arabia",
+    "SEN": "Senegal",
+    "SRB": "Serbia",
+    "SLE": "Sierra Leone",
+    "SGP": "Singapore",
+    "SVK": "Slovakia",
+    "SVN": "Slovenia",
+    "ZAF": "South Africa",
+    "KOR": "South Korea",
+    "ESP": "Spain",
+    "LKA": "Sri Lanka",
+    "SDN": "Sudan",
+    "SUR": "Suriname",
+    "SWE": "Sweden",
+    "CHE": "Switzerland",
+    "TJK": "Tajikistan",
+    "THA": "Thailand",
+    "TLS": "Timor-Leste",
+    "TGO": "Togo",
+    "TUN": "Tunisia",
+    "TUR": "Türkiye",
+    "UGA": "Uganda",
+    "UKR": "Ukraine",
+    "ARE": "United Arab Emirates",
+    "GBR": "United Kingdom",
+    "TZA": "Tanzania",
+    "USA": "United States",
+    "URY": "Uruguay",
+    "UZB": "Uzbekistan",
+    "VUT": "Vanuatu",
+    "VNM": "Vietnam",
+    "ZMB": "Zambia",
+    "ZWE": "Zimbabwe",
+    # Additional countries not in original list
+    "ABW": "Aruba",
+    "CAF": "Central African Republic",
+    "COG": "Congo",
+    "CUB": "Cuba",
+    "CYM": "Cayman Islands",
+    "ERI": "Eritrea",
+    "GAB": "Gabon",
+    "GNB": "Guinea-Bissau",
+    "GNQ": "Equatorial Guinea",
+    "GUM": "Guam",
+    "HTI": "Haiti",
+    "MAC": "Macao",
+    "MMR": "Myanmar",
+    "MRT": "Mauritania",
+    "MWI": "Malawi",
+    "NCL": "New Caledonia",
+    "PNG": "Papua New Guinea",
+    "PRI": "Puerto Rico",
+    "PRK": "North Korea",
+    "SSD": "South Sudan",
+    "STP": "São Tomé and Príncipe",
+    "SYC": "Seychelles",
+    "SYR": "Syria",
+    "TKM": "Turkmenistan",
+    "TTO": "Trinidad and Tobago",
+    "VEN": "Venezuela",
+    "YEM": "Yemen",
+}
+
+wef_country_to_code = {country: code for code, country in code_to_wef_country.items()}
+
+oecd_codes = ['AUS', 'AUT', 'BEL', 'CAN', 'CHE', 'CHL', 'COL', 'CRI', 'CZE',
+              'DEU', 'DNK', 'ESP', 'EST', 'FIN', 'FRA', 'GBR', 'GRC', 'HUN', 'IRL',
+              'ISL', 'ISR', 'ITA', 'JPN', 'KOR', 'LTU', 'LUX', 'LVA', 'MEX',
+              'NLD', 'NOR', 'NZL', 'POL', 'PRT', 'SVK', 'SVN', 'SWE', 'TUR', 'USA']
+
+
+
+
+# Names used by other sources (including the WEF report itself) that differ
+# from code_to_wef_country after normalization
+COUNTRY_ALIASES = {
+    "United States of America": "USA",
+    "Brunei Darussalam": "BRN",
+    "Moldova, Republic of": "MDA",
+    # truncated in the WEF report
+    "Congo, Democratic Republic of t": "COD",
+    "Congo, Democratic Republic of the": "COD",
+    "Democratic Republic of the Congo": "COD",
+    "United Republic of Tanzania": "TZA",
+    "Viet Nam": "VNM",
+    "Bosnia and Herzegovina": "BIH",
+    "Lao PDR": "LAO",
+    "Lao People's Democratic Republic": "LAO",
+    "Korea": "KOR",
+    "Korea, Republic of": "KOR",
+    "Republic of Korea": "KOR",
+    "Slovak Republic": "SVK",
+    "Czech Republic": "CZE",
+    "Turkey": "TUR",
+    "Turkiye": "TUR",
+    "Iran, Islamic Republic of": "IRN",
+    "Kyrgyz Republic": "KGZ",
+    "Egypt, Arab Republic of": "EGY",
+    "Gambia, The": "GMB",
+    "Syrian Arab Republic": "SYR",
+    "Cabo Verde": "CPV",
+    "Ivory Coast": "CIV",
+    "Swaziland": "SWZ",
+    "Macedonia": "MKD",
+    "Macao SAR, China": "MAC",
+    "Congo, Republic of": "COG",
+    "UK": "GBR",
+    "US": "USA",
+}
+
+
+def normalize_country_name(name):
+    """Fold a country name into a lookup key.
+
+    Removes diacritics, case, punctuation and a leading "the", so that
+    "Côte D'Ivoire", "Cote d'Ivoire" and "COTE DIVOIRE" give the same key.
+
+    Args:
+        name: string
+
+    Returns:
+        string key
+    """
+    name = unicodedata.normalize("NFKD", str(name))
+    name = "".join(c for c in name if not unicodedata.combining(c))
+    name = name.lower().replace("&", " and ")
+    name = re.sub(r"[^a-z0-9 ]+", "", name.replace("-", " "))
+    name = " ".join(name.split())
+    return name.removeprefix("the ")
+
+
+class CountryResolver:
+    """Map country names from any source to ISO codes.
+
+    Names are looked up in a hash index of normalized keys, built from the
+    canonical names, the ISO codes themselves and a table of aliases.  Names
+    that miss the index fall back to a fuzzy match, which is memoized per
+    resolver.  Fuzzy matches are recorded in fuzzy_matches, which maps each
+    name to the index key it matched, and resolve warns about them.
+    """
+
+    def __init__(self, code_to_name, aliases=None, cutoff=0.85):
+        """Build the index.
+
+        Args:
+            code_to_name: dictionary mapping ISO codes to canonical names
+            aliases: dictionary mapping other names to ISO codes
+            cutoff: minimum difflib similarity for a fuzzy match
+        """
+        self.cutoff = cutoff
+        self.index = {}
+        for code, name in code_to_name.items():
+            self.index[normalize_country_name(code)] = code
+            self.index[normalize_country_name(name)] = code
+        for name, code in (aliases or {}).items():
+            self.index[normalize_country_name(name)] = code
+        self._keys = list(self.index)
+        self._fuzzy_cache = {}
+        self.fuzzy_matches = {}
+
+    def _fuzzy_lookup(self, key):
+        if key not in self._fuzzy_cache:
+            matches = difflib.get_close_matches(
+                key, self._keys, n=1, cutoff=self.cutoff
+            )
+            self._fuzzy_cache[key] = matches[0] if matches else None
+        return self._fuzzy_cache[key]
+
+    def lookup(self, name):
+        """Find the ISO code for one name.
+
+        Args:
+            name: string
+
+        Returns:
+            ISO code, or None if there is no match
+        """
+        key = normalize_country_name(name)
+        code = self.index.get(key)
+        if code is None and key:
+            match = self._fuzzy_lookup(key)
+            if match is not None:
+                self.fuzzy_matches[name] = match
+                code = self.index[match]
+        return code
+
+    def resolve(self, names, errors="warn"):
+        """Map a sequence of names to ISO codes.
+
+        Each distinct name is looked up once and the result is mapped back
+        over the whole Series.  With errors='warn', names that only matched
+        fuzzily are reported along with the unmatched ones.
+
+        Args:
+            names: Series or sequence of country names
+            errors: 'warn', 'raise' or 'ignore' for names with no match
+
+        Returns:
+            Series of ISO codes with the same index as names, NaN where unmatched
+        """
+        names = pd.Series(names)
+        mapping = {name: self.lookup(name) for name in names.dropna().unique()}
+        codes = names.map(mapping)
+        codes.name = "code"
+
+        fuzzy = {
+            str(name): self.fuzzy_matches[name]
+            for name in mapping
+            if name in self.fuzzy_matches
+        }
+        if fuzzy and errors == "warn":
+            warnings.warn(f"Fuzzy-matched country names: {fuzzy}")
+
+        unmatched = sorted(str(name) for name, code in mapping.items() if code is None)
+        if unmatched:
+            message = f"Unmatched country names: {unmatched}"
+            if errors == "raise":
+                raise ValueError(message)
+            if errors == "warn":
+                warnings.warn(message)
+        return codes
+
+
+country_resolver = CountryResolver(code_to_wef_country, COUNTRY_ALIASES)
+
+
+def read_wef_file(filename):
+    """Read the WEF file and return a DataFrame.
+    
+    Country names are resolved with country_resolver, which warns about any
+    it can't match, and replaced with the canonical WEF names.
+
+    Args:
+        filename: name of the WEF file
+    """
+    df = pd.read_csv(filename)
+
+    codes = country_resolver.resolve(df["country"])
+    df["country"] = codes.map(code_to_wef_country).fillna(df["country"])
+    df.index = codes
+    df.index.name = "code"
+    return df
+
+
+# The WEF indicators extracted from the report, with the CSV and rank table
+# written by each notebook, the pattern passed to read_pdfs, the GGGI
+# subindex the indicator belongs to, and the column used as the revised score
+WEF_INDICATORS = {
+    "labour_participation": dict(
+        filename="wef_labour_participation.csv",
+        table="wef_labour_participation_table.csv",
+        pattern="labour-force participation rate",
+        subindex="economic",
+        revised="ratio",
+    ),
+    "wage_equality": dict(
+        filename="wef_wage_equality.csv",
+        table="wef_wage_equality_table.csv",
+        pattern="wage equality",
+        subindex="economic",
+        revised="score",
+    ),
+    "earned_income": dict(
+        filename="wef_earned_income.csv",
+        table="wef_earned_income_table.csv",
+        pattern="earned income",
+        subindex="economic",
+        revised="ratio",
+    ),
+    "legislators": dict(
+        filename="wef_legislators.csv",
+        table="wef_legislators_table.csv",
+        pattern="legislators",
+        subindex="economic",
+        revised="ratio",
+    ),
+    "professional_technical": dict(
+        filename="wef_professional_and_technical_workers.csv",
+        table="wef_professionals_table.csv",
+        pattern="professional and technical",
+        subindex="economic",
+        revised="ratio",
+    ),
+    "primary_education": dict(
+        filename="wef_primary_enrolment.csv",
+        table="wef_primary_enrolment_table.csv",
+        pattern="primary education",
+        subindex="education",
+        revised="ratio",
+    ),
+    "secondary_education": dict(
+        filename="wef_secondary_enrolment.csv",
+        table="wef_secondary_enrolment_table.csv",
+        pattern="secondary education",
+        subindex="education",
+        revised="ratio",
+    ),
+    "tertiary_education": dict(
+        filename="wef_tertiary_enrolment.csv",
+        table="wef_tertiary_enrolment_table.csv",
+        pattern="tertiary education",
+        subindex="education",
+        revised="ratio",
+    ),
+}
+
+
+def add_revised_scores(df, revised="ratio"):
+    """Add the ratio and revised_score columns to a WEF indicator frame.
+
+    Args:
+        df: DataFrame from read_wef_file
+        revised: column to use as the revised score
+
+    Returns:
+        df, modified in place
+    """
+    df["ratio"] = df["left"] / df["right"]
+    df["revised_score"] = df[revised]
+    return df
+
+
+def make_weights(column, label):
+    std = column.std() 
+    weights = pd.DataFrame(std, index=[label], columns=['std'])
+    weights['inv std'] = 0.01 / std
+    return weights
+
+def make_weight_table(table, label):
+    weights_orig = make_weights(table['score'], label)
+    weights_revised = make_weights(table['revised_score'], label)
+    weights = pd.concat([weights_orig, weights_revised],
+                        axis=1, 
+                        keys=['original', 'revised'])
+    return weights
+
+def make_rank_table(df):
+    columns = ['country', 'ratio', 'rank', 'revised_rank', 'score', 'revised_score']
+    df['revised_rank'] = df['revised_score'].rank(method='min', ascending=False)
+    table = df[columns]
+    return table
+
+
+class RankIndex:
+    """Revised scores kept in rank order, for updating one country at a time.
+
+    Ranks follow make_rank_table: highest score first, ties get the lowest
+    rank.  Scores are kept negated in a sorted list, so the countries whose
+    rank changes when one score changes are a contiguous slice found with
+    bisect.
+    """
+
+    def __init__(self, scores):
+        """Build the index.
+
+        Args:
+            scores: Series of scores indexed by code; NaNs are left out
+        """
+        scores = scores.dropna().sort_values(ascending=False, kind="stable")
+        self._keys = list(-scores.to_numpy(float))
+        self._codes = list(scores.index)
+        self.scores = scores.to_dict()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def rank(self, code):
+        """Rank of one country.
+
+        Args:
+            code: ISO code
+
+        Returns:
+            int rank
+        """
+        return bisect.bisect_left(self._keys, -self.scores[code]) + 1
+
+    def ranks(self):
+        """Ranks of all countries.
+
+        Returns:
+            Series of ranks indexed by code, in rank order
+        """
+        keys = np.array(self._keys)
+        ranks = np.searchsorted(keys, keys, side="left") + 1
+        return pd.Series(ranks, index=self._codes, name="revised_rank", dtype=float)
+
+    def _remove(self, code):
+        key = -self.scores.pop(code)
+        lo = bisect.bisect_left(self._keys, key)
+        i = self._codes.index(code, lo)
+        del self._keys[i]
+        del self._codes[i]
+        return key
+
+    def _insert(self, code, score):
+        key = -score
+        i = bisect.bisect_right(self._keys, key)
+        self._keys.insert(i, key)
+        self._codes.insert(i, code)
+        self.scores[code] = score
+
+    def update(self, code, score):
+        """Change (or add) the score for one country.
+
+        Only the countries whose scores lie between the old and new score
+        change rank, by one place each.
+
+        Args:
+            code: ISO code
+            score: new score
+
+        Returns:
+            tuple of the country's new rank and the list of other codes whose
+            rank changed
+        """
+        old_key = self._remove(code) if code in self.scores else np.inf
+        new_key = -score
+
+        # Negated scores in (min_key, max_key] are passed over by the change
+        low, high = sorted([old_key, new_key])
+        lo = bisect.bisect_right(self._keys, low)
+        hi = bisect.bisect_right(self._keys, high)
+        moved = self._codes[lo:hi]
+
+        self._insert(code, score)
+        return self.rank(code), moved
+
+    def update_table(self, table, code, score):
+        """Apply a corrected score to a rank table.
+
+        Args:
+            table: DataFrame from make_rank_table; not modified
+            code: ISO code
+            score: new revised score
+
+        Returns:
+            tuple of a new table and the list of codes whose rank changed,
+            including code
+        """
+        _, moved = self.update(code, score)
+        moved = [code] + moved
+
+        table = table.copy()
+        table.loc[code, "revised_score"] = score
+        table.loc[moved, "revised_rank"] = [self.rank(c) for c in moved]
+        return table, moved
+
+
+# =============================================================================
+# Lazy Plotting Imports
+# =============================================================================
+
+_PLOTTING_NAMES = {
+    "AIBM_COLORS",
+    "configure_plot_style",
+    "RASTER_FORMATS",
+    "PUBLISH_PROFILES",
+    "savefig",
+    "decorate",
+    "anchor_legend",
+    "add_text",
+    "remove_spines",
+    "add_logo",
+    "add_subtext",
+    "add_title",
+    "reverse_color_map",
+    "plot_responses",
+    "plot_responses_by_gender",
+    "stacked_bar_chart",
+    "plot_age_gender_summary",
+    "plot_estimate",
+    "plot_estimates",
+    "add_responses",
+    "plot_estimates_by_age_gender",
+    "plot_revised_scores",
+    "plot_revised_ranks",
+    "embolden_countries",
+    "render_dashboard",
+    "plot_score_distributions",
+    "plot_ecdfs",
+}
+
+
+def __getattr__(name):
+    """Import utils.plotting the first time one of its names is used."""
+    if name in _PLOTTING_NAMES:
+        from utils import plotting
+
+        return getattr(plotting, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _PLOTTING_NAMES)
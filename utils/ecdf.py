@@ -0,0 +1,98 @@
+"""Empirical CDFs for many columns and indicators at once.
+
+The indicator notebooks make a Cdf.from_seq for the dinged scores, the
+differences and the revised scores, one at a time.  ecdf_frame computes the
+same distributions for every indicator with one sort per column: the values
+from all indicators are sorted together by (indicator, value), and each
+indicator's cumulative proportions come from positions within its run.
+
+Example:
+
+    frames = {name: add_revised_scores(read_wef_file(spec["filename"]))
+              for name, spec in WEF_INDICATORS.items()}
+    ecdfs = ecdf_frame(frames, ["diff", "revised_score"], n_points=101)
+    plot_ecdfs(ecdfs.query("column == 'revised_score'"))
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _group_ecdfs(values, groups, n_points=None):
+    """Compute the ECDF of each group of values, with one sort.
+
+    Args:
+        values: float array without NaNs
+        groups: int array of group numbers, same length
+        n_points: number of evenly spaced probabilities to keep per group,
+            or None to keep every distinct value
+
+    Returns:
+        tuple of arrays: group, value, prob
+    """
+    # Sort by value, then by group with a stable radix sort of the small ints
+    order = np.argsort(values)
+    groups = groups.astype(np.int16 if groups.max(initial=0) < 1 << 15 else np.intp)
+    order = order[np.argsort(groups[order], kind="stable")]
+    values, groups = values[order], groups[order]
+
+    sizes = np.bincount(groups)
+    starts = np.cumsum(sizes) - sizes
+    position = np.arange(len(values)) - starts[groups]
+
+    # The last of each run of equal values carries the ECDF, like Cdf.from_seq
+    last = np.ones(len(values), dtype=bool)
+    last[:-1] = (values[1:] != values[:-1]) | (groups[1:] != groups[:-1])
+    keep = np.flatnonzero(last)
+
+    if n_points is not None:
+        # The inverse CDF at each probability, moved to the end of its run
+        probs = np.linspace(0, 1, n_points + 1)[1:]
+        present = np.flatnonzero(sizes)
+        ranks = np.ceil(probs * sizes[present, None]).astype(int) - 1
+        selected = (starts[present, None] + ranks).ravel()
+        run = np.cumsum(np.concatenate([[True], last[:-1]])) - 1
+        keep = np.unique(keep[run[selected]])
+
+    prob = (position[keep] + 1) / sizes[groups[keep]]
+    return groups[keep], values[keep], prob
+
+
+def ecdf_frame(frames, columns, n_points=None):
+    """Compute ECDFs for several columns of several DataFrames.
+
+    NaNs are dropped, as in Cdf.from_seq.
+
+    Args:
+        frames: DataFrame, or dictionary mapping names to DataFrames
+        columns: list of column names
+        n_points: number of evenly spaced probabilities to keep for each
+            ECDF, or None to keep every distinct value
+
+    Returns:
+        DataFrame with columns indicator, column, value and prob, sorted by
+        indicator, column and value; with a single DataFrame, there is no
+        indicator column
+    """
+    single = isinstance(frames, pd.DataFrame)
+    if single:
+        frames = {"": frames}
+    names = list(frames)
+
+    parts = []
+    for column in columns:
+        arrays = [frame[column].to_numpy(float) for frame in frames.values()]
+        values = np.concatenate(arrays)
+        groups = np.repeat(np.arange(len(arrays)), [len(a) for a in arrays])
+        valid = ~np.isnan(values)
+
+        group, value, prob = _group_ecdfs(values[valid], groups[valid], n_points)
+        part = pd.DataFrame(dict(value=value, prob=prob))
+        part.insert(0, "indicator", pd.Categorical.from_codes(group, names))
+        part.insert(1, "column", column)
+        parts.append(part)
+
+    ecdfs = pd.concat(parts, ignore_index=True)
+    ecdfs["column"] = pd.Categorical(ecdfs["column"], categories=columns)
+    ecdfs = ecdfs.sort_values(["indicator", "column"], kind="stable", ignore_index=True)
+    return ecdfs.drop(columns="indicator") if single else ecdfs
@@ -0,0 +1,178 @@
+"""Recompute the Global Gender Gap Index from the indicator scores.
+
+The WEF method weights each indicator by the inverse of its standard
+deviation (see make_weights), normalizes the weights within each subindex,
+averages the indicator scores within each subindex, and averages the
+subindexes into the overall index.  This module does that for all countries
+at once as matrix products, either with the WEF truncated scores or with
+the revised symmetric scores, and for many weighting schemes in one batch.
+
+Example:
+
+    gg = GenderGapIndex(IndicatorWarehouse.open())
+    gg.compare()
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.warehouse import IndicatorWarehouse
+
+# Which warehouse column holds the score under each scoring
+SCORINGS = {
+    "truncated": "score",
+    "symmetric": "revised_score",
+}
+
+
+def aggregate_scores(scores, weights, membership):
+    """Compute subindex and overall scores for a batch of weighting schemes.
+
+    Indicators a country is missing are left out of its weighted averages,
+    with the remaining weights renormalized.
+
+    Args:
+        scores: array (countries x indicators), NaN where missing
+        weights: array (schemes x indicators)
+        membership: 0/1 array (indicators x subindexes)
+
+    Returns:
+        tuple of arrays: subindex scores (schemes x countries x subindexes)
+        and overall scores (schemes x countries)
+    """
+    present = ~np.isnan(scores)
+    filled = np.where(present, scores, 0.0)
+
+    # (schemes x countries x indicators) @ (indicators x subindexes)
+    numerator = (filled[None, :, :] * weights[:, None, :]) @ membership
+    denominator = (present[None, :, :] * weights[:, None, :]) @ membership
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        subindex = numerator / denominator
+        overall = np.nanmean(subindex, axis=2)
+    return subindex, overall
+
+
+def rank_scores(scores):
+    """Rank countries by score within each row, highest first.
+
+    Args:
+        scores: DataFrame (schemes x countries)
+
+    Returns:
+        DataFrame of ranks, using the same method as make_rank_table
+    """
+    return scores.rank(axis=1, method="min", ascending=False)
+
+
+class GenderGapIndex:
+    """Subindex and overall scores computed from an IndicatorWarehouse."""
+
+    def __init__(self, warehouse=None):
+        """Collect the indicator scores.
+
+        Args:
+            warehouse: IndicatorWarehouse; by default, IndicatorWarehouse.open()
+        """
+        if warehouse is None:
+            warehouse = IndicatorWarehouse.open()
+        self.warehouse = warehouse
+
+        subindex = warehouse.frame.groupby(level="indicator")["subindex"].first()
+        self.indicators = list(subindex.index)
+        self.subindexes = sorted(subindex.unique())
+        self.membership = pd.crosstab(subindex.index, subindex).reindex(
+            index=self.indicators, columns=self.subindexes
+        )
+        self.membership.index.name = "indicator"
+
+        self.tables = {
+            scoring: warehouse.wide(column)[self.indicators]
+            for scoring, column in SCORINGS.items()
+        }
+        self.countries = warehouse.frame.groupby(level="code")["country"].first()
+
+    def weights(self, scoring="symmetric"):
+        """Compute the WEF inverse-standard-deviation weights.
+
+        Args:
+            scoring: 'truncated' or 'symmetric'
+
+        Returns:
+            Series of weights indexed by indicator
+        """
+        return 0.01 / self.tables[scoring].std()
+
+    def sweep(self, schemes, scoring="symmetric"):
+        """Compute overall scores and ranks for many weighting schemes.
+
+        Args:
+            schemes: DataFrame (schemes x indicators) of raw weights; they
+                are normalized within each subindex
+            scoring: 'truncated' or 'symmetric'
+
+        Returns:
+            tuple of DataFrames (schemes x countries): overall scores and ranks
+        """
+        table = self.tables[scoring]
+        weights = schemes.reindex(columns=self.indicators).fillna(0).to_numpy(float)
+        _, overall = aggregate_scores(
+            table.to_numpy(float), weights, self.membership.to_numpy(float)
+        )
+        scores = pd.DataFrame(overall, index=schemes.index, columns=table.index)
+        return scores, rank_scores(scores)
+
+    def compute(self, scoring="symmetric", weights=None):
+        """Compute subindex and overall scores and ranks.
+
+        Args:
+            scoring: 'truncated' or 'symmetric'
+            weights: Series of raw weights indexed by indicator; by default,
+                the WEF weights for this scoring
+
+        Returns:
+            DataFrame indexed by code with one column per subindex, plus
+            'overall' and 'rank'
+        """
+        if weights is None:
+            weights = self.weights(scoring)
+
+        table = self.tables[scoring]
+        schemes = pd.DataFrame([weights], index=[scoring])
+        subindex, overall = aggregate_scores(
+            table.to_numpy(float),
+            schemes.reindex(columns=self.indicators).fillna(0).to_numpy(float),
+            self.membership.to_numpy(float),
+        )
+
+        result = pd.DataFrame(subindex[0], index=table.index, columns=self.subindexes)
+        result.insert(0, "country", self.countries.reindex(table.index))
+        result["overall"] = overall[0]
+        result["rank"] = result["overall"].rank(method="min", ascending=False)
+        return result
+
+    def compare(self, weights=None):
+        """Compare the index under truncated and symmetric scoring.
+
+        Args:
+            weights: dictionary mapping scoring to a Series of raw weights;
+                by default, the WEF weights for each scoring
+
+        Returns:
+            DataFrame indexed by code, sorted by revised rank
+        """
+        weights = weights or {}
+        truncated = self.compute("truncated", weights.get("truncated"))
+        symmetric = self.compute("symmetric", weights.get("symmetric"))
+
+        table = pd.DataFrame(
+            {
+                "country": truncated["country"],
+                "score": truncated["overall"],
+                "revised_score": symmetric["overall"],
+                "rank": truncated["rank"],
+                "revised_rank": symmetric["rank"],
+            }
+        )
+        table["rank_change"] = table["rank"] - table["revised_rank"]
+        return table.sort_values("revised_rank")
@@ -0,0 +1,128 @@
+"""Load the PIAAC tables used in piaac.ipynb.
+
+The workbook is opened once and every sheet in PIAAC_SHEETS is read from
+the same parsed file.  Countries are mapped to ISO codes with
+country_resolver, and the parsed tables are cached as Parquet files keyed
+by a hash of the workbook, so later runs skip openpyxl entirely.
+
+Example:
+
+    tables = read_piaac()
+    piaac = tables["literacy_gender"]
+    piaac2 = tables["literacy_age_gender"]
+"""
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from utils import country_resolver
+
+PIAAC_FILE = "eb8dxq.xlsx"
+PIAAC_CACHE_DIR = ".piaac_cache"
+
+# Sheet layouts; columns named 'unused' are dropped
+# fmt: off
+PIAAC_SHEETS = {
+    "literacy_gender": dict(
+        sheet_name="A.2.7 (L)",
+        skiprows=6,
+        skipfooter=11,
+        columns=[
+            "country", "mean", "se",
+            "male_mean", "male_mean_se", "female_mean", "female_mean_se",
+            "diff", "diff_se",
+            "unused", "unused", "unused", "unused",
+            "male_percent", "male_percent_se", "female_percent", "female_percent_se",
+            "unused", "unused",
+        ],
+    ),
+    "literacy_age_gender": dict(
+        sheet_name="A.2.8 (L)",
+        skiprows=7,
+        skipfooter=11,
+        columns=[
+            "country", "mean", "se",
+            "male_1624", "unused",
+            "male_2544", "unused",
+            "male_4565", "unused",
+            "female_1624", "unused",
+            "female_2544", "unused",
+            "female_4565", "unused",
+        ],
+    ),
+}
+# fmt: on
+
+
+def _cache_key(filename, sheets):
+    """Hash the workbook contents and the sheet layouts."""
+    digest = hashlib.sha256()
+    with open(filename, "rb") as fp:
+        for block in iter(lambda: fp.read(1 << 20), b""):
+            digest.update(block)
+    digest.update(json.dumps(sheets, sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+def clean_piaac_sheet(df, columns):
+    """Name the columns, drop the unused ones, and index by ISO code.
+
+    Args:
+        df: DataFrame read from a PIAAC sheet
+        columns: list of column names for the sheet
+
+    Returns:
+        DataFrame indexed by code
+    """
+    df.columns = columns
+    df = df.drop(columns="unused", errors="ignore")
+
+    # Footnote markers, like 'Poland*'
+    df["country"] = df["country"].astype(str).str.replace(r"\*+$", "", regex=True)
+    numeric = df.columns.drop("country")
+    df[numeric] = df[numeric].apply(pd.to_numeric, errors="coerce").astype("float64")
+
+    df.index = country_resolver.resolve(df["country"])
+    df.index.name = "code"
+    return df
+
+
+def read_piaac(filename=PIAAC_FILE, sheets=PIAAC_SHEETS, cache_dir=PIAAC_CACHE_DIR):
+    """Read the PIAAC tables, from the cache if the workbook hasn't changed.
+
+    Args:
+        filename: path to the workbook
+        sheets: dictionary mapping table names to sheet layouts
+        cache_dir: directory for the Parquet cache, or None to skip it
+
+    Returns:
+        dictionary mapping table names to DataFrames indexed by code
+    """
+    paths = {}
+    if cache_dir:
+        key = _cache_key(filename, sheets)
+        paths = {
+            name: os.path.join(cache_dir, f"{key}_{name}.parquet") for name in sheets
+        }
+        if all(os.path.exists(path) for path in paths.values()):
+            return {name: pd.read_parquet(path) for name, path in paths.items()}
+
+    tables = {}
+    with pd.ExcelFile(filename) as workbook:
+        for name, layout in sheets.items():
+            df = pd.read_excel(
+                workbook,
+                sheet_name=layout["sheet_name"],
+                skiprows=layout["skiprows"],
+                skipfooter=layout["skipfooter"],
+            )
+            tables[name] = clean_piaac_sheet(df, layout["columns"])
+
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        for name, df in tables.items():
+            df.to_parquet(paths[name])
+    return tables
@@ -0,0 +1,753 @@
+"""Plotting functions for AIBM figures.
+
+Importing this module applies the AIBM plot style.
+"""
+
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from matplotlib import font_manager
+
+import matplotlib.image as mpimg
+import matplotlib.pyplot as plt
+import numpy as np
+
+from mpl_toolkits.axes_grid1.inset_locator import inset_axes
+
+from utils import underride
+
+# =============================================================================
+# Matplotlib Configuration
+# =============================================================================
+
+AIBM_COLORS = {
+    # AIBM brand colors
+    "light_gray": "#F3F4F3",
+    "medium_gray": "#767676",
+    "green": "#0B8569",
+    "light_green": "#AAC9B8",
+    "orange": "#C55300",
+    "light_orange": "#F4A26B",
+    "purple": "#9657A5",
+    "light_purple": "#CFBCD0",
+    "blue": "#4575D6",
+    "light_blue": "#C9D3E8",
+    # Additional colors from coolers.co
+    "dark_gray": "#404040",
+    "dark_purple": "#28112B",
+    "dark_green": "#002500",
+    "amber": "#F5BB00",
+    "oxford_blue": "#000022",
+    "bittersweet": "#FF6666",
+    "crimson": "#D62839",
+}
+
+
+def configure_plot_style():
+    """Configure the default matplotlib style for AIBM plots.
+
+    This function sets up the default style for plots, including:
+    - Figure size and DPI
+    - Color scheme
+    - Font settings
+    - Grid and spine settings
+    - Tick settings
+
+    The settings can be overridden for individual plots as needed.
+    """
+    # Figure size and DPI
+    plt.rcParams["figure.dpi"] = 100
+    plt.rcParams["figure.figsize"] = [8.75, 3.5]  # inches
+
+    # Default color cycle
+    colors = [
+        AIBM_COLORS["orange"],
+        AIBM_COLORS["green"],
+        AIBM_COLORS["blue"],
+        AIBM_COLORS["purple"],
+    ]
+    cycler = plt.cycler(color=colors)
+    plt.rc("axes", prop_cycle=cycler)
+
+    # Font settings
+    # Try to use PT Sans, fall back to system fonts if not available
+    if "PT Sans" in [f.name for f in font_manager.fontManager.ttflist]:
+        plt.rcParams["font.family"] = "PT Sans"
+    else:
+        plt.rcParams["font.family"] = "sans-serif"
+        plt.rcParams["font.sans-serif"] = [
+            "DejaVu Sans",
+            "Arial",
+            "Helvetica",
+            "sans-serif",
+        ]
+
+    plt.rcParams["legend.fontsize"] = "small"
+
+    # Tick and label colors
+    plt.rcParams["axes.edgecolor"] = AIBM_COLORS["medium_gray"]
+    plt.rcParams["xtick.color"] = AIBM_COLORS["medium_gray"]
+    plt.rcParams["ytick.color"] = AIBM_COLORS["medium_gray"]
+    plt.rcParams["axes.labelcolor"] = AIBM_COLORS["medium_gray"]
+
+    # Default spine settings (can be overridden per plot)
+    plt.rcParams["axes.spines.top"] = False
+    plt.rcParams["axes.spines.right"] = False
+    plt.rcParams["axes.spines.left"] = True  # Keep left spine by default
+    plt.rcParams["axes.spines.bottom"] = True  # Keep bottom spine by default
+
+    # Default grid settings (can be overridden per plot)
+    plt.rcParams["grid.color"] = AIBM_COLORS["light_gray"]
+    plt.rcParams["grid.linestyle"] = "-"
+    plt.rcParams["grid.linewidth"] = 1
+    plt.rcParams["axes.grid"] = False  # Disable grid by default
+    plt.rcParams["axes.grid.axis"] = "y"
+
+    # Tick mark settings
+    plt.rcParams["xtick.major.size"] = 0
+    plt.rcParams["xtick.minor.size"] = 0
+    plt.rcParams["ytick.major.size"] = 0
+    plt.rcParams["ytick.minor.size"] = 0
+
+
+# Apply the default style
+configure_plot_style()
+
+# =============================================================================
+# File I/O Functions
+# =============================================================================
+
+
+# Formats encoded with Pillow from a single Agg rendering
+RASTER_FORMATS = {
+    "png": "PNG",
+    "jpg": "JPEG",
+    "jpeg": "JPEG",
+    "webp": "WEBP",
+    "tif": "TIFF",
+    "tiff": "TIFF",
+}
+
+PUBLISH_PROFILES = [
+    dict(format="png", dpi=150),
+    dict(format="png", dpi=300, suffix="@2x"),
+    dict(format="svg"),
+    dict(format="pdf"),
+]
+
+
+def savefig(
+    prefix, fig_number, extra_artists=[], dpi=150, profiles=None, fixed_layout=False
+):
+    """Save the current figure with the given filename.
+
+    With `profiles`, the figure is written once per profile.  Each profile is a
+    dict with a `format`, an optional `dpi` and an optional filename `suffix`,
+    for example PUBLISH_PROFILES.  The figure is rasterized once at the highest
+    raster DPI and resampled for the others, and the image encoding runs in a
+    thread pool while the vector formats are drawn.
+
+    Args:
+        prefix: string prefix for filename
+        fig_number: The figure number
+        extra_artists: List of additional artist to include in the bounding box
+        dpi: Dots per inch for the saved image
+        profiles: list of output profiles, or None to save a single image
+        fixed_layout: if True, save the whole figure instead of computing a
+            tight bounding box around the extra artists
+
+    Returns:
+        list of filenames written, when profiles are given
+    """
+    filename = f"{prefix}{fig_number:02d}"
+    if profiles is None:
+        if extra_artists and not fixed_layout:
+            plt.savefig(
+                filename, dpi=dpi, bbox_inches="tight", bbox_extra_artists=extra_artists
+            )
+        else:
+            plt.savefig(filename, dpi=dpi)
+        return
+
+    fig = plt.gcf()
+
+    # Compute the tight bounding box once, so no output needs a second draw
+    bbox = None
+    if extra_artists and not fixed_layout:
+        fig.draw_without_rendering()
+        renderer = fig.canvas.get_renderer()
+        bbox = fig.get_tightbbox(renderer, bbox_extra_artists=extra_artists)
+        bbox = bbox.padded(plt.rcParams["savefig.pad_inches"])
+
+    raster = [p for p in profiles if p["format"].lower() in RASTER_FORMATS]
+    vector = [p for p in profiles if p["format"].lower() not in RASTER_FORMATS]
+
+    filenames = []
+    with ThreadPoolExecutor() as executor:
+        futures = []
+        if raster:
+            max_dpi = max(p.get("dpi", dpi) for p in raster)
+            image = _rasterize(fig, max_dpi, bbox)
+            for profile in raster:
+                name = _profile_filename(filename, profile)
+                image_format = RASTER_FORMATS[profile["format"].lower()]
+                profile_dpi = profile.get("dpi", dpi)
+                future = executor.submit(
+                    _encode_image, image, name, image_format, profile_dpi / max_dpi
+                )
+                futures.append(future)
+                filenames.append(name)
+
+        # Vector backends each need their own draw, which has to stay on
+        # this thread; the raster encodings run meanwhile
+        for profile in vector:
+            name = _profile_filename(filename, profile)
+            fig.savefig(
+                name,
+                format=profile["format"],
+                dpi=profile.get("dpi", dpi),
+                bbox_inches=bbox,
+            )
+            filenames.append(name)
+
+        for future in futures:
+            future.result()
+
+    return filenames
+
+
+def _profile_filename(filename, profile):
+    """Make the output filename for a savefig profile."""
+    return f"{filename}{profile.get('suffix', '')}.{profile['format'].lower()}"
+
+
+def _rasterize(fig, dpi, bbox=None):
+    """Render a figure with Agg and return an RGBA PIL image.
+
+    Args:
+        fig: Figure
+        dpi: dots per inch
+        bbox: optional Bbox in inches to save instead of the whole figure
+
+    Returns:
+        PIL.Image
+    """
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="raw", dpi=dpi, bbox_inches=bbox)
+
+    # Agg truncates the canvas height to whole pixels; the small offset
+    # absorbs floating-point error in the bbox transform
+    size = bbox.size if bbox is not None else fig.get_size_inches()
+    height = int(size[1] * dpi + 1e-6)
+    array = np.frombuffer(buffer.getvalue(), dtype=np.uint8)
+    return Image.fromarray(array.reshape(height, -1, 4))
+
+
+def _encode_image(image, filename, image_format, scale=1.0):
+    """Resample and encode a raster image for one savefig profile.
+
+    Args:
+        image: PIL.Image
+        filename: output filename
+        image_format: Pillow format name
+        scale: resampling factor relative to the rendered image
+    """
+    from PIL import Image
+
+    if scale != 1.0:
+        width = max(round(image.width * scale), 1)
+        height = max(round(image.height * scale), 1)
+        image = image.resize((width, height), Image.LANCZOS)
+
+    if image_format == "JPEG":
+        image = image.convert("RGB")
+    image.save(filename, format=image_format)
+
+
+# =============================================================================
+# Basic Plotting Functions
+# =============================================================================
+
+
+def decorate(**options):
+    """Decorate the current axes.
+
+    Call decorate with keyword arguments like
+    decorate(title='Title',
+             xlabel='x',
+             ylabel='y')
+
+    The keyword arguments can be any of the axis properties
+    https://matplotlib.org/api/axes_api.html
+    """
+    legend = options.pop("legend", True)
+    loc = options.pop("loc", "best")
+    ax = plt.gca()
+    ax.set(**options)
+
+    handles, labels = ax.get_legend_handles_labels()
+    if handles and legend:
+        ax.legend(handles, labels, loc=loc)
+
+    plt.tight_layout()
+
+
+def anchor_legend(x, y):
+    """Place the upper left corner of the legend box.
+
+    Args:
+        x: x coordinate
+        y: y coordinate
+    """
+    plt.legend(bbox_to_anchor=(x, y), loc="upper left", ncol=1)
+    plt.tight_layout()
+
+
+def add_text(x, y, text, **options):
+    """Add text to the current axes.
+
+    Args:
+        x: float
+        y: float
+        text: string
+        options: keyword arguments passed to plt.text
+    """
+    ax = plt.gca()
+    underride(
+        options,
+        transform=ax.transAxes,
+        color="0.2",
+        ha="left",
+        va="bottom",
+        fontsize=9,
+    )
+    plt.text(x, y, text, **options)
+
+
+def remove_spines():
+    """Remove the spines of a plot but keep the ticks visible."""
+    ax = plt.gca()
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+
+    # Ensure ticks stay visible
+    ax.xaxis.set_ticks_position("bottom")
+    ax.yaxis.set_ticks_position("left")
+
+
+def add_logo(filename="logo-hq-small.png", location=(1.0, -0.35), size=(0.5, 0.25)):
+    """Add a logo inside an inset axis positioned relative to the main plot.
+
+    Args:
+        filename: path to logo image
+        location: tuple of (x, y) coordinates
+        size: tuple of (width, height)
+
+    Returns:
+        The inset axis containing the logo
+    """
+    logo = mpimg.imread(filename)
+
+    # Create an inset axis in the given location
+    ax = plt.gca()
+    fig = ax.figure
+    ax_inset = inset_axes(
+        ax,
+        width=size[0],
+        height=size[1],
+        loc="lower right",
+        bbox_to_anchor=location,
+        bbox_transform=fig.transFigure,
+        borderpad=0,
+    )
+
+    # Display the logo
+    ax_inset.imshow(logo)
+    ax_inset.axis("off")
+
+    # Restore the original axes as current
+    plt.sca(ax)
+
+    return ax_inset
+
+
+def add_subtext(text, x=0, y=-0.35):
+    """Add a text label below the current plot.
+
+    Args:
+        text: string
+        x: x coordinate
+        y: y coordinate
+
+    Returns:
+        The text object
+    """
+    ax = plt.gca()
+    fig = ax.figure
+    return plt.figtext(
+        x, y, text, ha="left", va="bottom", fontsize=8, transform=fig.transFigure
+    )
+
+
+def add_title(title, subtitle, pad=25, x=0, y=1.02):
+    """Add a title and subtitle to the current plot.
+
+    Args:
+        title: Title of the plot
+        subtitle: Subtitle of the plot
+        pad: Padding between the title and subtitle
+        x: x coordinate for subtitle
+        y: y coordinate for subtitle
+    """
+    plt.title(title, loc="left", pad=pad)
+    add_text(x, y, subtitle)
+
+
+def reverse_color_map(color_map):
+    """Reverse the order of colors in a color map.
+
+    Args:
+        color_map: dictionary mapping values to colors
+
+    Returns:
+        dictionary with reversed color order
+    """
+    return {k: v for k, v in reversed(list(color_map.items()))}
+
+
+# =============================================================================
+# Survey Data Visualization Functions
+# =============================================================================
+
+
+def plot_responses(
+    summary, gender, response, issue_names, style, label_response=True, **options
+):
+    """Plot survey responses.
+
+    Args:
+        summary: DataFrame with response data
+        gender: gender code
+        response: response code
+        issue_names: list of issue names
+        style: dictionary of style parameters
+        label_response: whether to label the response
+        options: additional plotting options
+    """
+    # Filter data for this gender and response
+    data = summary[
+        (summary["gender"] == gender) & (summary["value"] == response)
+    ].copy()
+
+    # Plot each issue
+    for i, issue in enumerate(issue_names):
+        row = data[data["column"] == issue].iloc[0]
+        plot_estimate(i, row, style, label_response, **options)
+
+
+def plot_responses_by_gender(summary, response, issue_names, **options):
+    """Plot survey responses by gender.
+
+    Args:
+        summary: DataFrame with response data
+        response: response code
+        issue_names: list of issue names
+        options: additional plotting options
+    """
+    # Define styles for each gender
+    styles = {
+        1: dict(color=AIBM_COLORS["blue"], label="Men"),
+        2: dict(color=AIBM_COLORS["orange"], label="Women"),
+    }
+
+    # Plot responses for each gender
+    for gender in [1, 2]:
+        plot_responses(
+            summary, gender, response, issue_names, styles[gender], **options
+        )
+
+
+def stacked_bar_chart(y, estimate, color_map, **options):
+    """Create a stacked bar chart.
+
+    Args:
+        y: y coordinate
+        estimate: DataFrame with estimates
+        color_map: dictionary mapping values to colors
+        options: additional plotting options
+    """
+    # Plot each segment
+    for value, color in color_map.items():
+        row = estimate[estimate["value"] == value].iloc[0]
+        plt.barh(y, row["proportion"], color=color, **options)
+
+
+def plot_age_gender_summary(
+    summary, age_map, group_name_map, color_map, response_map, y=0
+):
+    """Plot summary by age and gender.
+
+    Args:
+        summary: DataFrame with summary data
+        age_map: dictionary mapping age codes to labels
+        group_name_map: dictionary mapping group codes to names
+        color_map: dictionary mapping values to colors
+        response_map: dictionary mapping response codes to labels
+        y: starting y coordinate
+    """
+    # Plot each age group
+    for age, age_label in age_map.items():
+        # Plot each gender
+        for gender, gender_label in group_name_map.items():
+            # Filter data for this age and gender
+            data = summary[
+                (summary["age"] == age) & (summary["gender"] == gender)
+            ].copy()
+
+            # Plot responses
+            for response, label in response_map.items():
+                row = data[data["value"] == response].iloc[0]
+                plot_estimate(y, row, color_map[response], label, **options)
+                y += 1
+
+
+def plot_estimate(y, row, style, label, **options):
+    """Plot a single estimate.
+
+    Args:
+        y: y coordinate
+        row: DataFrame row with estimate data
+        style: dictionary of style parameters
+        label: label for the estimate
+        options: additional plotting options
+    """
+    # Plot the estimate
+    plt.barh(y, row["proportion"], **style, **options)
+
+    # Add error bars
+    plt.errorbar(
+        row["proportion"],
+        y,
+        xerr=[[row["proportion"] - row["lower"]], [row["upper"] - row["proportion"]]],
+        fmt="none",
+        color="black",
+        capsize=3,
+    )
+
+    # Add label
+    if label:
+        plt.text(
+            row["proportion"] + 0.01,
+            y,
+            label,
+            va="center",
+            ha="left",
+            fontsize=9,
+        )
+
+
+def plot_estimates(estimate, style, label, **options):
+    """Plot multiple estimates.
+
+    Args:
+        estimate: DataFrame with estimates
+        style: dictionary of style parameters
+        label: label for the estimates
+        options: additional plotting options
+    """
+    # Plot each estimate
+    for i, row in estimate.iterrows():
+        plot_estimate(i, row, style, label, **options)
+
+
+def add_responses(response_map):
+    """Add response labels to the plot.
+
+    Args:
+        response_map: dictionary mapping response codes to labels
+    """
+    # Add each response label
+    for response, label in response_map.items():
+        plt.text(
+            0,
+            response,
+            label,
+            va="center",
+            ha="right",
+            fontsize=9,
+        )
+
+
+def plot_estimates_by_age_gender(summary, age_map, group_name_map, **options):
+    """Plot estimates by age and gender.
+
+    Args:
+        summary: DataFrame with summary data
+        age_map: dictionary mapping age codes to labels
+        group_name_map: dictionary mapping group codes to names
+        options: additional plotting options
+    """
+    # Plot each age group
+    for age, age_label in age_map.items():
+        # Plot each gender
+        for gender, gender_label in group_name_map.items():
+            # Filter data for this age and gender
+            data = summary[
+                (summary["age"] == age) & (summary["gender"] == gender)
+            ].copy()
+
+            # Plot estimates
+            plot_estimates(data, gender_label, **options)
+
+
+# =============================================================================
+# WEF Indicator Plots
+# =============================================================================
+
+
+def plot_revised_scores(df, ax=None):
+    """Plot revised scores for countries.
+
+    Args:
+        df: DataFrame with revised scores
+        ax: Axes to draw on; by default, makes a new figure
+    """
+    n = len(df)
+    if ax is None:
+        height = 15 * n / 100
+        fig, ax = plt.subplots(figsize=(6, height))
+    ax.hlines(
+        df["country"], df["score"], df["revised_score"], color=AIBM_COLORS["light_gray"]
+    )
+    ax.plot(df["score"], df["country"], "|", color=AIBM_COLORS["blue"])
+    ax.plot(df["revised_score"], df["country"], "<", color=AIBM_COLORS["blue"])
+    ax.invert_yaxis()
+    ax.set_ylim(n + 1, -1)
+    embolden_countries(["United States"], ax=ax)
+
+
+def plot_revised_ranks(df, ax=None):
+    """Plot revised ranks for countries.
+
+    Args:
+        df: DataFrame with revised ranks
+        ax: Axes to draw on; by default, makes a new figure
+    """
+    n = len(df)
+    if ax is None:
+        height = 15 * n / 100
+        fig, ax = plt.subplots(figsize=(6, height))
+    ax.hlines(
+        df["country"], df["rank"], df["revised_rank"], color=AIBM_COLORS["light_gray"]
+    )
+    ax.plot(df["rank"], df["country"], "|", color=AIBM_COLORS["blue"])
+    ax.plot(df["revised_rank"], df["country"], "o", color=AIBM_COLORS["blue"])
+    ax.invert_yaxis()
+    ax.set_ylim(n + 1, -1)
+    embolden_countries(["United States"], ax=ax)
+
+
+def embolden_countries(countries, ax=None):
+    # Make selected countries bold
+    if ax is None:
+        ax = plt.gca()
+    ytick_labels = ax.get_yticklabels()
+    for i, label in enumerate(ytick_labels):
+        if label.get_text() in countries:
+            plt.setp(label, fontweight="bold")
+
+
+def render_dashboard(
+    df, plot_func, prefix, chunk_size=40, dpi=150, thumb_dpi=30, width=6
+):
+    """Render a country chart as a full image, a thumbnail and pages.
+
+    The figures are made with matplotlib.figure.Figure rather than pyplot,
+    so this works headless under Agg and leaves no open figures behind.
+    Every page uses the x limits of the full chart so pages are comparable.
+
+    Args:
+        df: DataFrame sorted in plotting order
+        plot_func: plot_revised_scores, plot_revised_ranks or any function
+            that takes (df, ax=ax)
+        prefix: string prefix for filenames
+        chunk_size: number of countries per page
+        dpi: dots per inch for the full image and the pages
+        thumb_dpi: dots per inch for the thumbnail
+        width: figure width in inches
+
+    Returns:
+        dict with filenames for 'full', 'thumbnail' and a list of 'pages'
+    """
+    from matplotlib.figure import Figure
+
+    def make_figure(data):
+        height = max(15 * len(data) / 100, 1)
+        fig = Figure(figsize=(width, height))
+        ax = fig.subplots()
+        plot_func(data, ax=ax)
+        return fig, ax
+
+    os.makedirs(os.path.dirname(prefix) or ".", exist_ok=True)
+
+    fig, ax = make_figure(df)
+    xlim = ax.get_xlim()
+    fig.tight_layout()
+    manifest = dict(full=f"{prefix}.png", thumbnail=f"{prefix}_thumb.png", pages=[])
+    fig.savefig(manifest["full"], dpi=dpi)
+    fig.savefig(manifest["thumbnail"], dpi=thumb_dpi)
+
+    for i, start in enumerate(range(0, len(df), chunk_size)):
+        fig, ax = make_figure(df.iloc[start : start + chunk_size])
+        ax.set_xlim(xlim)
+        fig.tight_layout()
+        filename = f"{prefix}_p{i + 1:02d}.png"
+        fig.savefig(filename, dpi=dpi)
+        manifest["pages"].append(filename)
+
+    return manifest
+
+
+def plot_ecdfs(ecdfs, by="indicator", ax=None, **options):
+    """Plot ECDFs from ecdf_frame as step lines, one per group.
+
+    Args:
+        ecdfs: DataFrame with value and prob columns, like from ecdf_frame
+        by: column that identifies each line
+        ax: Axes to draw on; by default, the current Axes
+        options: passed to ax.step
+    """
+    if ax is None:
+        ax = plt.gca()
+    for name, group in ecdfs.groupby(by, observed=True, sort=False):
+        ax.step(group["value"], group["prob"], where="post", label=name, **options)
+    ax.set_ylabel("CDF")
+
+
+def plot_score_distributions(df, curves=None, **options):
+    """Plot the densities of the truncated and revised scores.
+
+    The densities come from utils.density, which caches them, so restyling
+    the figure doesn't recompute them.
+
+    Args:
+        df: DataFrame with score and revised_score columns
+        curves: DataFrame with score and revised_score curves, like one
+            indicator's columns from score_densities; computed if omitted
+        options: passed to decorate
+    """
+    if curves is None:
+        from utils.density import kde_curves
+
+        columns = ["score", "revised_score"]
+        curves = kde_curves({col: df[col] for col in columns}, bw_adjust=0.7)
+
+    plt.plot(curves.index, curves["score"], label="WEF truncated scores")
+    plt.plot(curves.index, curves["revised_score"], label="Revised symmetric scores")
+    plt.ylabel("Density")
+
+    decorate(**options)
+    add_subtext("Source: World Economic Forum", y=-0.25)
+    logo = add_logo(location=(1.0, -0.25))
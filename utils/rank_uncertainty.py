@@ -0,0 +1,227 @@
+"""Monte Carlo intervals for revised ranks.
+
+As in add_revised_scores, the revised score is either the ratio of two
+measured values, left / right (for the WEF indicators, women's and men's
+values; for PIAAC, female and male means), or a single measured column,
+like the score for wage equality.  simulate_ranks perturbs the measured
+values with normal measurement error, recomputes the scores and ranks for
+every draw, and summarizes the distribution of each country's rank.
+
+Draws are processed in chunks as (draws x countries) arrays, and only a
+(countries x ranks) histogram is kept between chunks, so memory stays
+bounded however many draws are requested.
+
+Example:
+
+    spec = WEF_INDICATORS["wage_equality"]
+    df = add_revised_scores(read_wef_file(spec["filename"]), spec["revised"])
+    simulate_ranks(df, revised=spec["revised"], relative_error=0.02)
+
+    simulate_ranks(piaac, left="female_mean", right="male_mean",
+                   left_se="female_mean_se", right_se="male_mean_se")
+"""
+
+import numpy as np
+import pandas as pd
+
+# A ratio is refused if its denominator is within this many standard errors
+# of zero, since the simulated ratios would be unbounded
+MIN_DENOMINATOR_Z = 4
+
+
+def ratio_score(left, right):
+    """Compute the revised score of the 'ratio' indicators."""
+    return left / right
+
+
+def column_score(value):
+    """Use a measured value as the revised score, as for wage equality."""
+    return value
+
+
+def _standard_errors(df, column, se, relative_error):
+    """Get an array of standard errors for one column.
+
+    Args:
+        df: DataFrame
+        column: name of the measured column
+        se: column name, number, or None
+        relative_error: used when se is None, as a fraction of the value
+
+    Returns:
+        array of standard errors
+    """
+    if se is None:
+        return np.abs(df[column].to_numpy(float)) * relative_error
+    if isinstance(se, str):
+        return df[se].to_numpy(float)
+    return np.full(len(df), float(se))
+
+
+def rank_draws(scores):
+    """Rank each row of scores, highest score first.
+
+    Uses one batched argsort; ties, which have probability zero for
+    continuous draws, are broken by position.
+
+    Args:
+        scores: array (draws x countries)
+
+    Returns:
+        int array of ranks starting at 1, same shape as scores
+    """
+    order = np.argsort(-scores, axis=1)
+    ranks = np.empty_like(order)
+    positions = np.broadcast_to(np.arange(1, scores.shape[1] + 1), scores.shape)
+    np.put_along_axis(ranks, order, positions, axis=1)
+    return ranks
+
+
+def rank_histogram(
+    values,
+    ses,
+    score=column_score,
+    n_draws=10000,
+    chunk_size=1000,
+    seed=None,
+):
+    """Count how often each country gets each rank.
+
+    Args:
+        values: list of arrays of measured values
+        ses: list of arrays of standard errors, one for each array in values
+        score: function that takes one array (draws x countries) per
+            measured value and returns the scores
+        n_draws: number of simulated draws
+        chunk_size: draws per chunk
+        seed: seed for numpy.random.default_rng
+
+    Returns:
+        int array (countries x ranks), where column j counts rank j + 1
+    """
+    rng = np.random.default_rng(seed)
+    n = len(values[0])
+    counts = np.zeros((n, n), dtype=np.int64)
+    offsets = np.arange(n) * n
+
+    for start in range(0, n_draws, chunk_size):
+        size = min(chunk_size, n_draws - start)
+        draws = [
+            value + rng.standard_normal((size, n)) * se
+            for value, se in zip(values, ses)
+        ]
+        ranks = rank_draws(score(*draws))
+
+        # Flatten (country, rank) pairs so one bincount fills the histogram
+        cells = offsets + ranks - 1
+        counts += np.bincount(cells.ravel(), minlength=n * n).reshape(n, n)
+
+    return counts
+
+
+def summarize_histogram(counts, confidence_level=0.9):
+    """Summarize rank histograms as intervals.
+
+    Args:
+        counts: int array (countries x ranks) from rank_histogram
+        confidence_level: coverage of the interval
+
+    Returns:
+        dictionary of arrays: rank_lower, rank_median, rank_upper, rank_mean
+    """
+    ranks = np.arange(1, counts.shape[1] + 1)
+    cdf = counts.cumsum(axis=1) / counts.sum(axis=1, keepdims=True)
+    tail = (1 - confidence_level) / 2
+
+    def quantile(q):
+        return ranks[(cdf < q).sum(axis=1)]
+
+    return dict(
+        rank_lower=quantile(tail),
+        rank_median=quantile(0.5),
+        rank_upper=quantile(1 - tail),
+        rank_mean=(counts * ranks).sum(axis=1) / counts.sum(axis=1),
+    )
+
+
+def simulate_ranks(
+    df,
+    revised="ratio",
+    left="left",
+    right="right",
+    left_se=None,
+    right_se=None,
+    score_se=None,
+    relative_error=0.01,
+    n_draws=10000,
+    chunk_size=1000,
+    confidence_level=0.9,
+    seed=None,
+):
+    """Simulate revised ranks under measurement error.
+
+    Rows where a measured value is missing are left out.
+
+    Args:
+        df: DataFrame with the measured columns
+        revised: 'ratio' to score by left / right, or the name of the column
+            that is the revised score, like the 'revised' entries of
+            WEF_INDICATORS
+        left: name of the numerator column
+        right: name of the denominator column
+        left_se: column name or number giving the standard error of left
+        right_se: column name or number giving the standard error of right
+        score_se: column name or number giving the standard error of the
+            revised column, when revised is not 'ratio'
+        relative_error: standard error as a fraction of the value, for
+            columns with no standard error given
+        n_draws: number of simulated draws
+        chunk_size: draws per chunk, which bounds memory use
+        confidence_level: coverage of the rank intervals
+        seed: seed for numpy.random.default_rng
+
+    Returns:
+        DataFrame with the point revised_rank and the rank intervals,
+        sorted by revised_rank
+
+    Raises:
+        ValueError if a denominator is within MIN_DENOMINATOR_Z standard
+        errors of zero
+    """
+    if revised == "ratio":
+        columns, score = [left, right], ratio_score
+        errors = [left_se, right_se]
+    else:
+        columns, score = [revised], column_score
+        errors = [score_se]
+
+    df = df.dropna(subset=columns)
+    values = [df[column].to_numpy(float) for column in columns]
+    ses = [
+        _standard_errors(df, column, se, relative_error)
+        for column, se in zip(columns, errors)
+    ]
+
+    if revised == "ratio":
+        near_zero = np.abs(values[1]) <= MIN_DENOMINATOR_Z * ses[1]
+        if near_zero.any():
+            rows = list(df.get("country", df.index)[near_zero])
+            raise ValueError(f"{right} is too close to zero for a ratio in {rows}")
+
+    counts = rank_histogram(
+        values,
+        ses,
+        score,
+        n_draws=n_draws,
+        chunk_size=chunk_size,
+        seed=seed,
+    )
+
+    table = pd.DataFrame(index=df.index)
+    if "country" in df:
+        table["country"] = df["country"]
+    revised_score = pd.Series(score(*values), index=df.index)
+    table["revised_rank"] = revised_score.rank(method="min", ascending=False)
+    for name, values in summarize_histogram(counts, confidence_level).items():
+        table[name] = values
+    return table.sort_values("revised_rank")
@@ -0,0 +1,155 @@
+"""Read only the survey columns an analysis uses.
+
+find_columns selects item columns by prefix after the whole file is in
+memory.  A SurveySchema reads just the column names of a CSV, Parquet or
+HDF5 file, resolves the same prefix selections (leaving out the 'skp' and
+'timing' columns), and then loads only the selected columns.
+
+Example:
+
+    schema = SurveySchema("survey.parquet")
+    schema.find_columns("q12")
+    df = schema.read(prefixes=["q12", "q13"], columns=["gender", "age", "weight"])
+"""
+
+import os
+
+import pandas as pd
+
+from utils import select_columns
+
+CSV_SUFFIXES = (".csv", ".csv.gz", ".csv.bz2", ".csv.zip", ".csv.xz")
+PARQUET_SUFFIXES = (".parquet", ".pq")
+HDF_SUFFIXES = (".h5", ".hdf5", ".hdf")
+
+
+def file_format(path):
+    """Guess a survey file's format from its name.
+
+    Args:
+        path: file name
+
+    Returns:
+        'csv', 'parquet' or 'hdf'
+    """
+    name = str(path).lower()
+    for fmt, suffixes in [
+        ("csv", CSV_SUFFIXES),
+        ("parquet", PARQUET_SUFFIXES),
+        ("hdf", HDF_SUFFIXES),
+    ]:
+        if name.endswith(suffixes):
+            return fmt
+    raise ValueError(f"Unknown survey file format: {path}")
+
+
+class SurveySchema:
+    """The column names of a survey file, read without loading the data."""
+
+    def __init__(self, path, key=None, **options):
+        """Read the header or metadata of a survey file.
+
+        Args:
+            path: CSV, Parquet or HDF5 file
+            key: group in an HDF5 file; by default, the only one
+            options: passed to pd.read_csv when reading a CSV file
+        """
+        self.path = path
+        self.format = file_format(path)
+        self.key = key
+        self.options = options
+
+        if self.format == "csv":
+            header = pd.read_csv(path, nrows=0, **options)
+            self.columns = list(header.columns)
+        elif self.format == "parquet":
+            import pyarrow.parquet as pq
+
+            schema = pq.read_schema(path)
+            # Leave out stored index columns, which read_parquet restores
+            metadata = schema.pandas_metadata or {}
+            index = [
+                name
+                for name in metadata.get("index_columns", [])
+                if isinstance(name, str)
+            ]
+            self.columns = [col for col in schema.names if col not in index]
+        else:
+            with pd.HDFStore(path, mode="r") as store:
+                if self.key is None:
+                    (self.key,) = store.keys()
+                storer = store.get_storer(self.key)
+                self.is_table = storer.is_table
+                self.columns = list(store.select(self.key, stop=0).columns)
+
+    def __repr__(self):
+        name = os.path.basename(str(self.path))
+        return f"SurveySchema({name!r}, {len(self.columns)} columns)"
+
+    def find_columns(self, prefix):
+        """Find columns that start with a given prefix, like find_columns.
+
+        Args:
+            prefix: string prefix, or tuple of prefixes
+
+        Returns:
+            list of column names
+        """
+        return select_columns(self.columns, prefix)
+
+    def resolve(self, prefixes=(), columns=()):
+        """Resolve prefix selections and explicit columns into one list.
+
+        Args:
+            prefixes: sequence of string prefixes
+            columns: sequence of column names to include as they are
+
+        Returns:
+            list of column names, in file order
+        """
+        missing = set(columns) - set(self.columns)
+        if missing:
+            raise KeyError(f"Columns not in {self.path}: {sorted(missing)}")
+
+        selected = set(columns)
+        if prefixes:
+            selected.update(self.find_columns(tuple(prefixes)))
+        return [col for col in self.columns if col in selected]
+
+    def read(self, prefixes=(), columns=()):
+        """Load only the selected columns.
+
+        Fixed-format HDF5 files can't be read by column, so they are read
+        whole and then projected.
+
+        Args:
+            prefixes: sequence of string prefixes
+            columns: sequence of column names to include as they are
+
+        Returns:
+            DataFrame with the selected columns, in file order
+        """
+        usecols = self.resolve(prefixes, columns)
+
+        if self.format == "csv":
+            return pd.read_csv(self.path, usecols=usecols, **self.options)[usecols]
+        if self.format == "parquet":
+            return pd.read_parquet(self.path, columns=usecols)
+        if self.is_table:
+            return pd.read_hdf(self.path, self.key, columns=usecols)
+        return pd.read_hdf(self.path, self.key)[usecols]
+
+
+def read_survey(path, prefixes=(), columns=(), **options):
+    """Read the columns of a survey file that match some prefixes.
+
+    Args:
+        path: CSV, Parquet or HDF5 file
+        prefixes: sequence of string prefixes
+        columns: sequence of column names to include as they are
+        options: passed to SurveySchema
+
+    Returns:
+        DataFrame
+    """
+    return SurveySchema(path, **options).read(prefixes, columns)
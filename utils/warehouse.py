@@ -0,0 +1,176 @@
+"""A single table of every WEF indicator, keyed by ISO code and indicator.
+
+The warehouse reads each indicator CSV once, adds the ratio, revised score
+and revised rank, and stores the result in a Parquet file.  Later sessions
+load the Parquet file instead of re-reading the CSVs, unless one of them has
+changed since.
+
+Example:
+
+    wh = IndicatorWarehouse.open()
+    wh.subset(oecd_codes).wide("revised_score")
+"""
+
+import os
+
+import pandas as pd
+
+from utils import WEF_INDICATORS, add_revised_scores, read_wef_file
+
+WAREHOUSE_FILE = "wef_warehouse.parquet"
+
+COLUMNS = [
+    "country",
+    "page_number",
+    "rank",
+    "score",
+    "diff",
+    "left",
+    "right",
+    "ratio",
+    "revised_score",
+    "revised_rank",
+]
+
+
+def load_indicator(name, directory=".", indicators=WEF_INDICATORS):
+    """Read one indicator file and add ratio, revised score and revised rank.
+
+    Args:
+        name: key in indicators
+        directory: directory containing the CSV files
+        indicators: dictionary of indicator specs, like WEF_INDICATORS
+
+    Returns:
+        DataFrame indexed by code
+    """
+    spec = indicators[name]
+    df = read_wef_file(os.path.join(directory, spec["filename"]))
+    df = df[df.index.notna()]
+    add_revised_scores(df, spec["revised"])
+    df["revised_rank"] = df["revised_score"].rank(method="min", ascending=False)
+    return df.reindex(columns=COLUMNS)
+
+
+class IndicatorWarehouse:
+    """All WEF indicators in one frame indexed by (code, indicator)."""
+
+    def __init__(self, frame):
+        """Wrap a frame indexed by (code, indicator).
+
+        Args:
+            frame: DataFrame
+        """
+        self.frame = frame
+
+    @classmethod
+    def build(cls, directory=".", indicators=WEF_INDICATORS):
+        """Read the indicator CSV files that exist in directory.
+
+        Args:
+            directory: directory containing the CSV files
+            indicators: dictionary of indicator specs, like WEF_INDICATORS
+
+        Returns:
+            IndicatorWarehouse
+        """
+        frames = {}
+        for name, spec in indicators.items():
+            if os.path.exists(os.path.join(directory, spec["filename"])):
+                frames[name] = load_indicator(name, directory, indicators)
+        if not frames:
+            raise FileNotFoundError(f"No indicator files found in {directory!r}")
+
+        frame = pd.concat(frames, names=["indicator", "code"])
+        frame = frame.swaplevel().sort_index()
+        subindex = {name: spec["subindex"] for name, spec in indicators.items()}
+        frame.insert(
+            1, "subindex", frame.index.get_level_values("indicator").map(subindex)
+        )
+        return cls(frame)
+
+    @classmethod
+    def load(cls, path=WAREHOUSE_FILE):
+        """Load a warehouse saved with save.
+
+        Args:
+            path: Parquet filename
+
+        Returns:
+            IndicatorWarehouse
+        """
+        return cls(pd.read_parquet(path))
+
+    @classmethod
+    def open(cls, path=WAREHOUSE_FILE, directory=".", indicators=WEF_INDICATORS):
+        """Load the saved warehouse, rebuilding it if any CSV is newer.
+
+        Args:
+            path: Parquet filename
+            directory: directory containing the CSV files
+            indicators: dictionary of indicator specs, like WEF_INDICATORS
+
+        Returns:
+            IndicatorWarehouse
+        """
+        sources = [
+            os.path.join(directory, spec["filename"]) for spec in indicators.values()
+        ]
+        sources = [source for source in sources if os.path.exists(source)]
+        if os.path.exists(path):
+            mtime = os.path.getmtime(path)
+            if all(os.path.getmtime(source) <= mtime for source in sources):
+                return cls.load(path)
+
+        warehouse = cls.build(directory, indicators)
+        warehouse.save(path)
+        return warehouse
+
+    def save(self, path=WAREHOUSE_FILE):
+        """Write the warehouse to a Parquet file.
+
+        Args:
+            path: Parquet filename
+        """
+        self.frame.to_parquet(path)
+
+    @property
+    def indicators(self):
+        """List of indicator names in the warehouse."""
+        return list(self.frame.index.unique("indicator"))
+
+    def indicator(self, name):
+        """Select one indicator.
+
+        Args:
+            name: indicator name
+
+        Returns:
+            DataFrame indexed by code
+        """
+        return self.frame.xs(name, level="indicator")
+
+    def subset(self, codes):
+        """Select a group of countries, like oecd_codes.
+
+        Codes with no data are skipped.
+
+        Args:
+            codes: sequence of ISO codes
+
+        Returns:
+            IndicatorWarehouse
+        """
+        present = self.frame.index.get_level_values("code").isin(codes)
+        return IndicatorWarehouse(self.frame[present])
+
+    def wide(self, column="revised_score"):
+        """Make a table with one row per country and one column per indicator.
+
+        Args:
+            column: column to spread
+
+        Returns:
+            DataFrame indexed by code
+        """
+        return self.frame[column].unstack("indicator")